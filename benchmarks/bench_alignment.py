@@ -0,0 +1,70 @@
+"""Benchmark the batch NumPy Smith-Waterman aligner on one query against many targets"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from proteomics.alignment import GAP_EXTEND, GAP_OPEN, align_batch
+from proteomics.encoding import AMINO_ACIDS
+
+
+def make_sequences(count, seed=0):
+    """Random proteins with a UniProt-like length distribution (median ~300 residues)"""
+    rng = np.random.default_rng(seed)
+    lengths = np.clip(rng.lognormal(mean=np.log(300), sigma=0.6, size=count), 30, 2000).astype(int)
+    letters = np.array(list(AMINO_ACIDS))
+    return ["".join(rng.choice(letters, length)) for length in lengths]
+
+
+def biopython_align(query, targets):
+    """Reference: Biopython's C pairwise aligner, one target at a time, score only"""
+    from Bio import Align
+    from Bio.Align import substitution_matrices
+
+    aligner = Align.PairwiseAligner(
+        mode="local",
+        substitution_matrix=substitution_matrices.load("BLOSUM62"),
+        open_gap_score=-(GAP_OPEN + GAP_EXTEND),
+        extend_gap_score=-GAP_EXTEND,
+    )
+    return [aligner.score(query, target) for target in targets]
+
+
+def time_call(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--targets", type=int, default=1000, help="Number of targets per query")
+    parser.add_argument("--query-length", type=int, default=350, help="Residues in the query")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per implementation")
+    args = parser.parse_args()
+
+    query = make_sequences(1, seed=1)[0][:args.query_length]
+    query = query + "".join(np.random.default_rng(2).choice(list(AMINO_ACIDS), max(args.query_length - len(query), 0)))
+    targets = make_sequences(args.targets)
+    cells = len(query) * sum(len(target) for target in targets)
+
+    panel = time_call(align_batch, query, targets[:10], repeat=args.repeat)
+    batch = time_call(align_batch, query, targets, repeat=args.repeat)
+    reference = time_call(biopython_align, query, targets, repeat=args.repeat)
+
+    print(f"query length:             {len(query)}")
+    print(f"targets:                  {len(targets)} (median length {int(np.median([len(t) for t in targets]))})")
+    print(f"1x10 (results panel):     {panel * 1000:.1f} ms")
+    print(f"1x{len(targets)} batch NumPy:      {batch:.3f} s  ({cells / batch / 1e6:.1f} M cells/s, with identity/coverage)")
+    print(f"1x{len(targets)} Biopython (C):    {reference:.3f} s  ({cells / reference / 1e6:.1f} M cells/s, score only)")
+
+
+if __name__ == "__main__":
+    main()
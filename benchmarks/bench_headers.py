@@ -0,0 +1,53 @@
+"""Benchmark the single-pass UniProt header parser against the legacy multi-pass extraction"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from proteomics.headers import parse_headers
+from synthetic import make_headers
+
+
+def legacy_extract(descriptions):
+    """The six-pass str.extract implementation previously used by the dashboard"""
+    df = pd.DataFrame({"Description": descriptions})
+    df["Protein Name"] = df["Description"].str.extract(r"\|[A-Z0-9_]+\|([^OS]+)")
+    df["OS"] = df["Description"].str.extract(r"OS=([^OXGNPE]+)")
+    df["OX"] = df["Description"].str.extract(r"OX=(\d+)")
+    df["GN"] = df["Description"].str.extract(r"GN=([^ ]+)")
+    df["PE"] = df["Description"].str.extract(r"PE=(\d+)")
+    df["SV"] = df["Description"].str.extract(r"SV=(\d+)")
+    return df.drop(columns=["Description"])
+
+
+def time_call(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--count", type=int, default=140_000, help="Number of headers to parse")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per implementation")
+    args = parser.parse_args()
+
+    headers = make_headers(args.count)
+    legacy = time_call(legacy_extract, headers, repeat=args.repeat)
+    single = time_call(parse_headers, headers, repeat=args.repeat)
+
+    print(f"headers:             {args.count}")
+    print(f"legacy multi-pass:   {legacy:.3f} s")
+    print(f"single-pass parser:  {single:.3f} s")
+    print(f"speedup:             {legacy / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Benchmark every hot path of the dashboards on seeded synthetic FASTA and OBO datasets"""
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import pandas as pd
+
+from proteomics.fasta_stream import iter_fasta_batches
+from proteomics.headers import parse_headers
+from proteomics.table import compact_table, concat_tables
+from synthetic import ensure_dataset
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, "data")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+FASTA_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+OBO_SIZES = [1_000, 10_000, 100_000]
+
+# Radius the Gene Ontology page draws its DAG with
+DAG_RADIUS = 10000
+
+# Result fields compared between runs, with the unit they are printed in
+COMPARED_FIELDS = [("wall_s", "s", 1), ("peak_rss_bytes", "MiB", 1 << 20), ("payload_bytes", "KiB", 1 << 10)]
+
+
+def _frame_bytes(frame):
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def parse_records(path):
+    """Stream a FASTA file into the protein table: records plus parsed header fields"""
+    frames = []
+    with open(path, "rb") as handle:
+        for batch in iter_fasta_batches(handle):
+            frame = pd.DataFrame({"ID": batch["ID"], "Length": batch["Length"], "Sequence": batch["Sequence"]})
+            frames.append(compact_table(pd.concat([frame, parse_headers(batch["Description"])], axis=1)))
+    return concat_tables(frames)
+
+
+def _analyze(analyze_fasta_file, path, workers):
+    with open(path, "rb") as handle:
+        return analyze_fasta_file(iter_fasta_batches(handle), workers=workers)
+
+
+def _analysis_bytes(stats):
+    encoded = stats["encoded"]
+    return (
+        _frame_bytes(stats["dataframe"]) + _frame_bytes(stats["properties"])
+        + encoded.codes.nbytes + encoded.offsets.nbytes
+    )
+
+
+# Each stage does its setup, imports included, and returns (timed call, payload size of its result)
+
+def stage_parse(path, workers):
+    return lambda: parse_records(path), _frame_bytes
+
+
+def stage_analyze(path, workers):
+    from proteomic_dashboard import analyze_fasta_file
+
+    return lambda: _analyze(analyze_fasta_file, path, workers), _analysis_bytes
+
+
+def stage_general_plots(path, workers):
+    from proteomic_dashboard import analyze_fasta_file, generate_general_tab_plots
+    from proteomics.dataset import DatasetHandle
+
+    stats = _analyze(analyze_fasta_file, path, workers)
+    dataset = DatasetHandle.from_path(path)
+    return (
+        lambda: generate_general_tab_plots(dataset, stats, stats["dataframe"]),
+        lambda plots: sum(len(spec.encode("utf-8")) for spec in plots.values()),
+    )
+
+
+def stage_load_obo(path, workers):
+    from genomic_navigator import load_obo
+
+    return lambda: load_obo(path), lambda graph: len(pickle.dumps(graph))
+
+
+def stage_dag_html(path, workers):
+    from genomic_navigator import create_dag_html, load_obo
+
+    graph = load_obo(path)
+    # The newest term sits deepest in the generated DAG, so it has the most ancestors
+    term = max(graph.nodes)
+    return lambda: create_dag_html(graph, term, radius=DAG_RADIUS), lambda html: len(html.encode("utf-8"))
+
+
+# Stage name -> (dataset kind, stage function)
+STAGES = {
+    "parse_fasta": ("fasta", stage_parse),
+    "analyze_fasta_file": ("fasta", stage_analyze),
+    "generate_general_tab_plots": ("fasta", stage_general_plots),
+    "load_obo": ("obo", stage_load_obo),
+    "create_dag_html": ("obo", stage_dag_html),
+}
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak RSS of this process (Linux), so setup does not count towards a stage"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _status_bytes(field):
+    """A memory field of /proc/self/status in bytes, or None off Linux"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_bytes(reset):
+    if reset:
+        return _status_bytes("VmHWM")
+    # ru_maxrss is in KiB on Linux and bytes on macOS, and covers setup too
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def run_stage(name, path, workers):
+    """Run one stage in this (fresh) process and measure it"""
+    os.chdir(REPO_DIR)
+    # Drop the bare-mode warnings Streamlit logs when cached functions run outside an app
+    from streamlit.logger import set_log_level
+    set_log_level("error")
+    run, payload = STAGES[name][1](path, workers)
+    start_rss = _status_bytes("VmRSS")
+    reset = _reset_peak_rss()
+    start = time.perf_counter()
+    result = run()
+    wall = time.perf_counter() - start
+    peak = _peak_rss_bytes(reset)
+    return {
+        "wall_s": wall,
+        "start_rss_bytes": start_rss,
+        "peak_rss_bytes": peak,
+        # Largest worker process, when the stage used a pool
+        "worker_peak_rss_bytes": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024,
+        "payload_bytes": int(payload(result)),
+    }
+
+
+def measure(name, path, workers, repeat):
+    """Best wall time over repeat runs, each in a fresh interpreter so caches and heaps start cold"""
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            runs.append(pool.submit(run_stage, name, path, workers).result())
+    best = min(runs, key=lambda run: run["wall_s"])
+    best["wall_runs_s"] = [run["wall_s"] for run in runs]
+    best["peak_rss_bytes"] = max(run["peak_rss_bytes"] for run in runs)
+    return best
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+
+def run_suite(stages, fasta_sizes, obo_sizes, workers, repeat, seed):
+    sizes = {"fasta": fasta_sizes, "obo": obo_sizes}
+    results = []
+    for name in stages:
+        kind, _ = STAGES[name]
+        for count in sizes[kind]:
+            path = ensure_dataset(DATA_DIR, kind, count, seed=seed)
+            result = {"stage": name, "dataset": os.path.basename(path), "records": count, "input_bytes": os.path.getsize(path)}
+            result.update(measure(name, path, workers, repeat))
+            results.append(result)
+            print(
+                f"{name:28s} {count:>9,} {result['wall_s']:9.3f} s "
+                f"{result['peak_rss_bytes'] / (1 << 20):9.1f} MiB {result['payload_bytes'] / (1 << 10):11.1f} KiB",
+                flush=True,
+            )
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "workers": workers,
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(base_path, new_path):
+    """Print every stage and size found in both runs with the new/base ratio of each metric"""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    base_results = {(result["stage"], result["records"]): result for result in base["results"]}
+    print(f"base {base['commit']} ({base['timestamp']})  ->  new {new['commit']} ({new['timestamp']})")
+    for result in new["results"]:
+        previous = base_results.get((result["stage"], result["records"]))
+        if previous is None:
+            continue
+        cells = []
+        for field, unit, scale in COMPARED_FIELDS:
+            ratio = result[field] / previous[field] if previous[field] else float("nan")
+            cells.append(f"{result[field] / scale:10.2f} {unit} ({ratio:5.2f}x)")
+        print(f"{result['stage']:28s} {result['records']:>9,}  " + "  ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES), help="Stages to run")
+    parser.add_argument("--fasta-sizes", nargs="+", type=int, default=FASTA_SIZES, help="FASTA record counts")
+    parser.add_argument("--obo-sizes", nargs="+", type=int, default=OBO_SIZES, help="OBO term counts")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="Worker processes for the FASTA pipeline")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per stage and size, each in a fresh process")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic datasets")
+    parser.add_argument("-o", "--output", help="JSON file to write (default: results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    print(f"{'stage':28s} {'records':>9s} {'wall':>11s} {'peak RSS':>13s} {'payload':>15s}")
+    report = run_suite(args.stages, args.fasta_sizes, args.obo_sizes, args.workers, args.repeat, args.seed)
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = report["timestamp"].replace(":", "").replace("-", "")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['commit']}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
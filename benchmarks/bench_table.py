@@ -0,0 +1,57 @@
+"""Report the memory of the parsed protein table per column, in the legacy object layout and the compact one"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from proteomics.fasta_stream import iter_fasta_batches
+from proteomics.headers import parse_headers
+from proteomics.parallel import analyze_shard, merge_shards
+from proteomics.table import table_memory
+from synthetic import ensure_dataset
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def legacy_table(path):
+    """The protein table as the pipeline previously built it: Python strings and nullable integers"""
+    frames = []
+    with open(path, "rb") as handle:
+        for batch in iter_fasta_batches(handle):
+            frame = pd.DataFrame({"ID": batch["ID"], "Length": batch["Length"], "Sequence": batch["Sequence"]})
+            frames.append(pd.concat([frame, parse_headers(batch["Description"])], axis=1))
+    return pd.concat(frames, ignore_index=True)
+
+
+def pipeline_table(path):
+    """The protein table as the pipeline now builds it"""
+    with open(path, "rb") as handle:
+        return merge_shards(analyze_shard(batch) for batch in iter_fasta_batches(handle))[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--count", type=int, default=100_000, help="Records of the synthetic FASTA file")
+    parser.add_argument("--fasta", help="Measure this FASTA file instead of a synthetic one")
+    args = parser.parse_args()
+
+    path = args.fasta or ensure_dataset(DATA_DIR, "fasta", args.count)
+    before = table_memory(legacy_table(path))
+    after = table_memory(pipeline_table(path))
+    metadata = [column for column in before.index if column != "Sequence"]
+
+    print(f"{'column':14s} {'before MiB':>11s} {'after MiB':>10s} {'reduction':>10s}")
+    for column in before.index:
+        print(f"{column:14s} {before[column] / (1 << 20):11.2f} {after[column] / (1 << 20):10.2f} {before[column] / after[column]:9.2f}x")
+    for label, columns in (("metadata", metadata), ("total", list(before.index))):
+        print(
+            f"{label:14s} {before[columns].sum() / (1 << 20):11.2f} {after[columns].sum() / (1 << 20):10.2f} "
+            f"{before[columns].sum() / after[columns].sum():9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Seeded synthetic FASTA and OBO datasets shaped like the files the dashboards load"""
+import os
+import random
+
+import numpy as np
+
+from proteomics.encoding import AMINO_ACIDS
+
+ORGANISMS = [
+    "Homo sapiens",
+    "Mus musculus",
+    "Arabidopsis thaliana",
+    "Saccharomyces cerevisiae (strain ATCC 204508 / S288c)",
+    "Bacillus subtilis subsp. subtilis NCIB 3610 = ATCC 6051 = DSM 10",
+    "Escherichia coli (strain K12)",
+]
+PROTEIN_NAMES = [
+    "Serine/threonine-protein kinase OSR1",
+    "Heterogeneous nuclear ribonucleoprotein U, hnRNP U=MATRIX attachment region binding protein",
+    "p60=60 kDa stress-related protein",
+    "Uncharacterized protein",
+    "Probable ATP-dependent RNA helicase DDX5",
+]
+
+# UniProtKB/Swiss-Prot residue frequencies (%), in AMINO_ACIDS order
+RESIDUE_FREQUENCIES = np.array([
+    8.25, 1.38, 5.46, 6.72, 3.86, 7.07, 2.27, 5.91, 5.80, 9.64,
+    2.41, 4.06, 4.74, 3.93, 5.53, 6.65, 5.36, 6.86, 1.10, 2.92,
+])
+RESIDUE_FREQUENCIES = RESIDUE_FREQUENCIES / RESIDUE_FREQUENCIES.sum()
+
+# Residues per FASTA line, as in UniProt downloads
+LINE_WIDTH = 60
+# Records generated and written per chunk
+CHUNK_RECORDS = 10_000
+
+NAMESPACES = ["biological_process", "molecular_function", "cellular_component"]
+GO_VERBS = ["regulation of", "positive regulation of", "negative regulation of", "response to", "transport of"]
+GO_NOUNS = ["kinase activity", "RNA splicing", "protein binding", "membrane", "cell cycle", "DNA repair", "mitochondrion"]
+
+
+def make_headers(count, seed=0, rare_organisms=0.0):
+    """
+    Generate CAFA-style headers, including the variants that break naive regexes.
+    A rare_organisms fraction of the records names one of a long, Zipf-distributed
+    tail of organisms, as the OS counts of large UniProt extracts do.
+    """
+    rng = random.Random(seed)
+    headers = []
+    for i in range(count):
+        accession = f"Q{i:07d}"
+        gene = f" GN=GENE{i}" if rng.random() > 0.15 else ""
+        database, name, organism = rng.choice(["sp", "tr"]), rng.choice(PROTEIN_NAMES), rng.choice(ORGANISMS)
+        if rare_organisms and rng.random() < rare_organisms:
+            organism = f"Organism sp. {int(rng.paretovariate(1.0))}"
+        headers.append(
+            f"{accession} {database}|{accession}|{accession}_HUMAN "
+            f"{name} OS={organism} OX={rng.randint(1, 10**6)}"
+            f"{gene} PE={rng.randint(1, 5)} SV={rng.randint(1, 3)}"
+        )
+    return headers
+
+
+def make_sequences(count, rng):
+    """Random proteins with UniProt residue frequencies and lengths (median ~300 residues)"""
+    lengths = np.clip(rng.lognormal(mean=np.log(300), sigma=0.6, size=count), 30, 5000).astype(int)
+    letters = np.frombuffer(AMINO_ACIDS.encode("ascii"), dtype=np.uint8)
+    residues = letters[rng.choice(len(letters), int(lengths.sum()), p=RESIDUE_FREQUENCIES)].tobytes()
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    return [residues[offsets[i]:offsets[i + 1]] for i in range(count)]
+
+
+def write_fasta(path, count, seed=0):
+    """Write count records with realistic headers, wrapped like UniProt downloads"""
+    rng = np.random.default_rng(seed)
+    headers = make_headers(count, seed=seed, rare_organisms=0.1)
+    with open(path, "wb") as f:
+        for start in range(0, count, CHUNK_RECORDS):
+            chunk = []
+            for header, sequence in zip(headers[start:start + CHUNK_RECORDS], make_sequences(min(CHUNK_RECORDS, count - start), rng)):
+                chunk.append(b">" + header.encode("ascii") + b"\n")
+                for line in range(0, len(sequence), LINE_WIDTH):
+                    chunk.append(sequence[line:line + LINE_WIDTH] + b"\n")
+            f.write(b"".join(chunk))
+    return path
+
+
+def _term_id(index):
+    return f"GO:{index:07d}"
+
+
+def _term_name(rng, index):
+    return f"{rng.choice(GO_VERBS)} {rng.choice(GO_NOUNS)} {index}"
+
+
+def write_obo(path, count, seed=0):
+    """
+    Write a GO-like ontology of count terms. Each term has one to three is_a
+    parents among the earlier terms of its namespace, and some a part_of
+    relationship, so the graph is a DAG of logarithmic depth like GO's.
+    """
+    rng = random.Random(seed)
+    names = [_term_name(rng, index) for index in range(count)]
+    by_namespace = {namespace: [] for namespace in NAMESPACES}
+    lines = ["format-version: 1.2", "data-version: synthetic", "ontology: go", ""]
+    for index in range(count):
+        namespace = NAMESPACES[index % len(NAMESPACES)]
+        earlier = by_namespace[namespace]
+        lines += [
+            "[Term]",
+            f"id: {_term_id(index)}",
+            f"name: {names[index]}",
+            f"namespace: {namespace}",
+            f'def: "Any process that modulates {names[index]}." [GOC:go_curators, PMID:{rng.randint(10**6, 4 * 10**7)}]',
+        ]
+        if rng.random() < 0.5:
+            lines.append(f'synonym: "{names[index]} (synonym)" EXACT []')
+        if earlier:
+            parents = rng.sample(earlier, min(len(earlier), rng.choices([1, 2, 3], weights=[6, 3, 1])[0]))
+            lines += [f"is_a: {_term_id(parent)} ! {names[parent]}" for parent in parents]
+            if rng.random() < 0.2:
+                part_of = rng.choice(earlier)
+                lines.append(f"relationship: part_of {_term_id(part_of)} ! {names[part_of]}")
+        lines.append("")
+        earlier.append(index)
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+    return path
+
+
+def ensure_dataset(data_dir, kind, count, seed=0):
+    """Return the path of a generated dataset, writing it on first use"""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic-{count}-seed{seed}.{kind}")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        (write_fasta if kind == "fasta" else write_obo)(tmp_path, count, seed=seed)
+        os.replace(tmp_path, path)
+    return path
@@ -13,6 +13,10 @@ from python_styles.visualizer_style import (MAIN_CSS,
                                             TAB_VALUE_DIV_OVERFLOW_WRAP 
                                             )
 from python_styles.sidebar_style import SIDEBAR_CSS
+from utils.instrumentation import cache_data, record_payload, render_debug_panel, stage, start_metrics_server
+
+# Page label of this explorer's stage timings and payload metrics
+METRICS_PAGE = "structure"
 # Set page layout to wide
 # st.set_page_config(layout="wide")
 
@@ -50,16 +54,17 @@ def render_protein_structure(pdb_string, style="cartoon", color="spectrum"):
     
     return view
 
-@st.cache_data(ttl=timedelta(hours=24))
+@cache_data(ttl=timedelta(hours=24))
 def fetch_pdb_structure(pdb_id):
     """Fetch PDB structure from RCSB with caching"""
     url = f"https://files.rcsb.org/view/{pdb_id}.pdb"
-    response = requests.get(url)
+    with stage(METRICS_PAGE, "fetch_structure"):
+        response = requests.get(url)
     if response.status_code == 200:
         return response.text
     return None
 
-@st.cache_data(ttl=timedelta(hours=24))
+@cache_data(ttl=timedelta(hours=24))
 def get_protein_info(pdb_id):
     """Fetch detailed protein information from PDB API with caching"""
     base_url = f"https://data.rcsb.org/rest/v1/core/entry/{pdb_id}"
@@ -67,9 +72,10 @@ def get_protein_info(pdb_id):
     assembly_url = f"https://data.rcsb.org/rest/v1/core/assembly/{pdb_id}/1"
     
     try:
-        response = requests.get(base_url)
-        entity_response = requests.get(entity_url)
-        assembly_response = requests.get(assembly_url)
+        with stage(METRICS_PAGE, "fetch_info"):
+            response = requests.get(base_url)
+            entity_response = requests.get(entity_url)
+            assembly_response = requests.get(assembly_url)
         
         data = {}
         if response.status_code == 200:
@@ -203,6 +209,7 @@ def display_protein_info(pdb_id, data):
 
 def main():
     st.markdown(SIDEBAR_CSS, unsafe_allow_html=True)
+    start_metrics_server()
     
     st.markdown("""
         <style>
@@ -398,7 +405,10 @@ def main():
             viz_col, _, info_col = st.columns([1, 0.8, 1])
             
             with viz_col:
-                view = render_protein_structure(st.session_state.pdb_string, style=style, color=color)
+                with stage(METRICS_PAGE, "structure_view"):
+                    view = render_protein_structure(st.session_state.pdb_string, style=style, color=color)
+                # showmol embeds the PDB text in the viewer's HTML, where it is nearly all of the bytes
+                record_payload(METRICS_PAGE, "html", st.session_state.pdb_string)
                 showmol(view, height=600, width=800)
             
             with info_col:
@@ -416,5 +426,7 @@ def main():
                     use_container_width=True
                 )
 
+    render_debug_panel()
+
 if __name__ == "__main__":
     main()
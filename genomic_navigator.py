@@ -12,8 +12,12 @@ from python_styles.obo_analysis_style import (MAIN_CSS,
                                               INFORMATION_CONTAINER_KEY_DIV,
                                               INFORMATION_CONTAINER_VALUE_DIV)
 from python_styles.sidebar_style import SIDEBAR_CSS
+from utils.instrumentation import cache_data, record_payload, render_debug_panel, stage, start_metrics_server
 from datetime import timedelta
 
+# Page label of this navigator's stage timings and payload metrics
+METRICS_PAGE = "ontology"
+
 # Emoji mappings
 EMOJI_MAP = {
     "total": "",    # Removed emoji
@@ -49,13 +53,14 @@ def parse_definition(definition_text):
     
     return main_def, references
 
-@st.cache_data(ttl=timedelta(hours=24))
+@cache_data(ttl=timedelta(hours=24))
 def load_obo(file_path):
     """Load an .obo file and return a NetworkX graph."""
-    graph = obonet.read_obo(file_path)
+    with stage(METRICS_PAGE, "load_obo"):
+        graph = obonet.read_obo(file_path)
     return graph
 
-@st.cache_data(ttl=timedelta(hours=24))
+@cache_data(ttl=timedelta(hours=24))
 def extract_node_info(_graph, term):
     """Extract metadata for a specific term in the .obo graph."""
     if term in _graph.nodes:
@@ -63,33 +68,35 @@ def extract_node_info(_graph, term):
     else:
         return {}
 
-@st.cache_data(ttl=timedelta(hours=24))
+@cache_data(ttl=timedelta(hours=24))
 def create_dag_html(_graph, term, radius=1):
     """Create DAG visualization and return HTML content directly without file I/O"""
     # Create DAG
-    subgraph = nx.ego_graph(_graph, term, radius=radius)
-    for node in subgraph.nodes(data=True):
-        node[1]["label"] = f"{node[0]}: {node[1].get('name', 'No Name')}"
-        node[1]["color"] = {
-            'background': 'rgba(66, 214, 79, 0.35)',
-            'border': '#42d64f',
-            'highlight': {
-                'background': 'rgba(66, 214, 79, 0.5)',
-                'border': '#42d64f'
+    with stage(METRICS_PAGE, "dag_build"):
+        subgraph = nx.ego_graph(_graph, term, radius=radius)
+        for node in subgraph.nodes(data=True):
+            node[1]["label"] = f"{node[0]}: {node[1].get('name', 'No Name')}"
+            node[1]["color"] = {
+                'background': 'rgba(66, 214, 79, 0.35)',
+                'border': '#42d64f',
+                'highlight': {
+                    'background': 'rgba(66, 214, 79, 0.5)',
+                    'border': '#42d64f'
+                }
             }
-        }
-        node[1]["font"] = {
-            'color': '#ffffff',
-            'size': 14,
-            'face': 'arial'
-        }
-    
-    # Create Network
-    net = Network(directed=True, height="500px", width="100%", notebook=False, bgcolor='rgba(34, 34, 35, 0.3)')
-    net.from_nx(subgraph)
+            node[1]["font"] = {
+                'color': '#ffffff',
+                'size': 14,
+                'face': 'arial'
+            }
+        
+        # Create Network
+        net = Network(directed=True, height="500px", width="100%", notebook=False, bgcolor='rgba(34, 34, 35, 0.3)')
+        net.from_nx(subgraph)
     
     # Generate HTML content directly using the hidden method
-    html_content = net.generate_html()
+    with stage(METRICS_PAGE, "html_generation"):
+        html_content = net.generate_html()
     
     # Add our custom styling
     html_content = html_content.replace("</head>", f"{MAIN_CSS}</head>")
@@ -120,6 +127,7 @@ def create_metric_container(label, value, unit=""):
 # Streamlit UI
 def main():
     st.markdown(SIDEBAR_CSS, unsafe_allow_html=True)
+    start_metrics_server()
     
     # Hide the decoration bar
     hide_decoration_bar_style = '''
@@ -361,6 +369,7 @@ def main():
                     html_content = st.session_state.dag_cache[selected_term]
 
                 # Display the visualization
+                record_payload(METRICS_PAGE, "html", html_content)
                 st.components.v1.html(html_content, height=700, scrolling=False)
 
     # Clear session state only when explicitly requested
@@ -370,5 +379,7 @@ def main():
             if key in st.session_state:
                 del st.session_state[key]
 
+    render_debug_panel()
+
 if __name__ == "__main__":
     main()
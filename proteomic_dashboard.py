@@ -2,13 +2,12 @@ import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-from Bio import SeqIO
 from Bio.SeqUtils.ProtParam import ProteinAnalysis
-import io
 import numpy as np
-from collections import Counter
+import pyarrow as pa
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from python_styles.fasta_stats_style import (
     MAIN_CSS,
     METRIC_CONTAINER_OUTER_DIV,
@@ -16,10 +15,102 @@ from python_styles.fasta_stats_style import (
     METRIC_CONTAINER_H3
 )
 from python_styles.sidebar_style import SIDEBAR_CSS
+from proteomics.fasta_stream import COMPRESSED_EXTENSIONS, FASTA_EXTENSIONS, iter_fasta_batches, open_decompressed
+from proteomics.fasta_index import FastaIndex, first_positions
+from proteomics.sequence_store import (
+    STORE_SCHEMA,
+    ensure_sequence_store,
+    load_store_dataframe,
+    open_sequence_store,
+    read_store_metadata
+)
+from proteomics.encoding import (
+    EncodedSequences,
+    composition_counts,
+    counts_to_dict
+)
+from proteomics.parallel import (
+    DEFAULT_WORKERS,
+    analyze_shard,
+    compute_properties_sharded,
+    imap_ordered,
+    merge_shards
+)
+from proteomics.profiles import (
+    FLEXIBILITY_WINDOW,
+    MAX_PROFILE_POINTS,
+    charge_profile,
+    downsample_lttb,
+    flexibility_scale_profile,
+    hydropathy_profile
+)
+from proteomics.dataset import DatasetHandle, dataset_cache_key
+from proteomics.summary import DatasetSummary, update_summary
+from proteomics.streaming import DATA_ROOT, FastaShards, fasta_paths, resolve_data_path, summarize_fasta_shards
+from proteomics.report import find_report, load_report, load_report_properties
+from proteomics.table import compact_table
+from proteomics.search import DEFAULT_PAGE_SIZE, ProteinSearchIndex
+from proteomics.similarity import DEFAULT_TOP_N, SimilarityIndex, open_similarity_index
+from proteomics.alignment import MAX_ALIGN_LENGTH, align_batch
+from proteomics.dedup import DEFAULT_IDENTITY, MIN_IDENTITY, cluster_summary, deduplicate
+from proteomics.result_cache import (
+    ResultCache,
+    cache_key,
+    hash_bytes,
+    pack_analysis,
+    unpack_analysis
+)
+from utils.instrumentation import (
+    cache_data,
+    record_payload,
+    render_debug_panel,
+    stage,
+    start_metrics_server
+)
+import json
 import os
 from datetime import timedelta
 
-@st.cache_data(ttl=timedelta(hours=24))
+# Page label of this dashboard's stage timings and payload metrics
+METRICS_PAGE = "proteomics"
+
+# Cached functions key datasets on their fingerprint rather than hashing their content
+DATASET_HASH_FUNCS = {DatasetHandle: dataset_cache_key}
+
+# (property column, plot key, plot title, x-axis label) for the General tab distributions
+PROPERTY_PLOTS = [
+    ("Molecular Weight", "mw_dist", "Molecular Weight Distribution", "Molecular Weight (Da)"),
+    ("Theoretical pI", "pi_dist", "Theoretical pI Distribution", "Theoretical pI"),
+    ("GRAVY", "gravy_dist", "GRAVY Distribution", "GRAVY"),
+    ("Aromaticity", "aromaticity_dist", "Aromaticity Distribution", "Aromaticity"),
+    ("Instability Index", "instability_dist", "Instability Index Distribution", "Instability Index"),
+    ("Charge at pH 7", "charge_dist", "Charge at pH 7 Distribution", "Charge at pH 7"),
+]
+
+# Upper bound on the JSON shipped to the browser per figure; binned charts are
+# rebinned coarser until they fit
+MAX_FIGURE_PAYLOAD_BYTES = 256 * 1024
+MIN_HISTOGRAM_BINS = 10
+
+# Line traces with more points than this are drawn with WebGL
+WEBGL_POINT_THRESHOLD = 1000
+
+# Similar proteins are aligned automatically up to this many DP cells (query x
+# target residues, about half a second); larger alignments run on request, up to
+# the hard cap, since the DP cost grows with the product of the lengths
+AUTO_ALIGN_CELLS = 1 << 23
+MAX_ALIGN_CELLS = 1 << 28
+# Measured throughput of the batch aligner, used to estimate on-request waits
+ALIGN_SECONDS_PER_CELL = 6e-8
+
+# Scale name -> (profile function, plot title, y-axis label) for the Specific tab profile
+PROFILE_SCALES = {
+    "Flexibility": (flexibility_scale_profile, "Flexibility Profile", "Flexibility Score"),
+    "Hydropathy (Kyte-Doolittle)": (hydropathy_profile, "Hydropathy Profile", "Hydropathy Score"),
+    "Charge at pH 7": (charge_profile, "Charge Profile", "Mean Charge at pH 7"),
+}
+
+@cache_data(ttl=timedelta(hours=24))
 def create_plotly_template():
     """Create a dark theme template for plotly with both vertical and horizontal gridlines"""
     return dict(
@@ -30,7 +121,6 @@ def create_plotly_template():
         )
     )
 
-@st.cache_data(ttl=timedelta(hours=24))
 def create_metric_container(label, value, unit=""):
     st.markdown(f"""
         <div style="{METRIC_CONTAINER_OUTER_DIV}">
@@ -39,54 +129,50 @@ def create_metric_container(label, value, unit=""):
         </div>
     """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=timedelta(hours=24))
-def parse_fasta_records(file_content):
-    """Parse FASTA records with caching"""
-    return list(SeqIO.parse(io.StringIO(file_content), "fasta"))
-
-@st.cache_data(ttl=timedelta(hours=24))
-def analyze_fasta_file(_records):
+def analyze_fasta_file(batches, workers=1, progress=None):
     """Analyze general statistics of the FASTA file and preprocess data"""
-    # Create initial DataFrame
-    data = []
-    for record in _records:
-        data.append({
-            "ID": record.id,
-            "Description": record.description,
-            "Length": len(record.seq),
-            "Sequence": str(record.seq)
-        })
-    
-    df = pd.DataFrame(data)
-    
-    # Extract metadata fields from Description
-    df["Protein Name"] = df["Description"].str.extract(r"\|[A-Z0-9_]+\|([^OS]+)")
-    df["OS"] = df["Description"].str.extract(r"OS=([^OXGNPE]+)")
-    df["OX"] = df["Description"].str.extract(r"OX=(\d+)")
-    df["GN"] = df["Description"].str.extract(r"GN=([^ ]+)")
-    df["PE"] = df["Description"].str.extract(r"PE=(\d+)")
-    df["SV"] = df["Description"].str.extract(r"SV=(\d+)")
+    # Each streamed batch is parsed, encoded and profiled as one shard,
+    # optionally across a process pool, then merged back in file order
+    with stage(METRICS_PAGE, "parse"):
+        shards = list(imap_ordered(analyze_shard, batches, workers=workers, progress=progress))
+    if not shards:
+        raise ValueError("No FASTA records found in file")
     
-    # Drop Description column
-    df.drop(columns=["Description"], inplace=True)
-    
-    # Calculate length statistics
-    lengths = df['Length'].values
-    
-    return {
-        'total_sequences': len(_records),
-        'avg_length': np.mean(lengths),
-        'min_length': min(lengths),
-        'max_length': max(lengths),
-        'std_length': np.std(lengths),
-        'median_length': np.median(lengths),
-        'percentile_25': np.percentile(lengths, 25),
-        'percentile_75': np.percentile(lengths, 75),
-        'lengths': lengths,
+    with stage(METRICS_PAGE, "dataframe"):
+        df, encoded, properties, summary = merge_shards(shards)
+    del shards
+    return summarize_fasta_dataframe(df, encoded, properties, summary)
+
+def summarize_fasta_dataframe(df, encoded, properties, summary):
+    """Assemble the general statistics of a parsed FASTA table from its mergeable summary"""
+    # Moments and counts are exact; the median and quartiles come from a KLL sketch
+    stats = summary.stats()
+    stats.update({
+        'lengths': df['Length'].to_numpy(),
+        'aa_counts': counts_to_dict(summary.aa_counts),
+        'summary': summary,
+        'encoded': encoded,
+        'properties': properties,
         'dataframe': df
-    }
+    })
+    return stats
+
+def analyze_sequence_store(store_path, summary, workers=1, progress=None, properties=None):
+    """Analyze general statistics from a memory-mapped sequence store"""
+    # Sequences stay on disk and are read per protein through the FASTA index
+    columns = [name for name in STORE_SCHEMA.names if name != 'Sequence']
+    with stage(METRICS_PAGE, "dataframe"):
+        df = load_store_dataframe(store_path, columns=columns)
+        # Residues are encoded per block straight from the mapped file, never copied whole
+        encoded = EncodedSequences.map_arrow(open_sequence_store(store_path).column('Sequence'))
+    if df.empty:
+        raise ValueError("No FASTA records found in file")
+    if properties is None:
+        with stage(METRICS_PAGE, "properties"):
+            properties = compute_properties_sharded(encoded, ids=df['ID'].to_numpy(), workers=workers, progress=progress)
+    return summarize_fasta_dataframe(df, encoded, properties, summary)
 
-@st.cache_data(ttl=timedelta(hours=24))
+@cache_data(ttl=timedelta(hours=24))
 def analyze_protein_sequence(sequence):
     """Analyze a specific protein sequence"""
     protein = ProteinAnalysis(str(sequence))
@@ -99,42 +185,62 @@ def analyze_protein_sequence(sequence):
         'secondary_structure': protein.secondary_structure_fraction(),
         'aa_composition': protein.get_amino_acids_percent(),
         'aa_count': protein.count_amino_acids(),
-        'flexibility': protein.flexibility(),
         'extinction_coefficients': protein.molar_extinction_coefficient(),
         'charge_at_ph7': protein.charge_at_pH(7.0)
     }
 
-@st.cache_data(ttl=timedelta(hours=24))
-def generate_length_distribution_plot(lengths):
-    """Generate sequence length distribution histogram"""
-    fig = px.histogram(
-        x=lengths,
-        nbins=50,
-        color_discrete_sequence=['#42d64f'],
-        title="Sequence Length Distribution"
+def figure_payload_bytes(fig):
+    """Size of the JSON a figure sends to the browser"""
+    return len(fig.to_json())
+
+def build_histogram_figure(values, title, x_label, nbins, height, title_x):
+    """Bin values server-side with NumPy and draw the counts as bars, never the raw points"""
+    values = values[np.isfinite(values)]
+    return build_binned_histogram_figure(
+        lambda bins: np.histogram(values, bins=bins), title, x_label, nbins, height, title_x
     )
-    fig.update_traces(
-        marker=dict(
-            color='rgba(66, 214, 79, 0.35)',
-            line=dict(color='#42d64f', width=2)
+
+def build_binned_histogram_figure(histogram, title, x_label, nbins, height, title_x):
+    """Draw histogram(nbins) -> (counts, edges) as bars, rebinning coarser until the figure fits"""
+    while True:
+        counts, edges = histogram(nbins)
+        fig = go.Figure(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            marker=dict(
+                color='rgba(66, 214, 79, 0.35)',
+                line=dict(color='#42d64f', width=2)
+            )
+        ))
+        fig.update_layout(
+            template=create_plotly_template(),
+            title=title,
+            xaxis_title=x_label,
+            yaxis_title="Count",
+            showlegend=False,
+            height=height,
+            title_x=title_x
         )
-    )
-    fig.update_layout(
-        template=create_plotly_template(),
-        xaxis_title="Sequence Length",
-        yaxis_title="Count",
-        showlegend=False,
-        height=700,
-        title_x=0.45
-    )
-    _add_grid_styling(fig)
-    return fig
+        _add_grid_styling(fig)
+        if nbins <= MIN_HISTOGRAM_BINS or figure_payload_bytes(fig) <= MAX_FIGURE_PAYLOAD_BYTES:
+            return fig
+        nbins = max(nbins // 2, MIN_HISTOGRAM_BINS)
+
+def generate_length_distribution_plot(lengths, nbins=50):
+    """Generate sequence length distribution histogram"""
+    return build_histogram_figure(lengths, "Sequence Length Distribution", "Sequence Length", nbins, 700, 0.45)
+
+def generate_property_distribution_plot(values, title, x_label, nbins=50):
+    """Generate a pre-binned histogram for one physicochemical property"""
+    return build_histogram_figure(values, title, x_label, nbins, 500, 0.35)
 
-@st.cache_data(ttl=timedelta(hours=24))
-def generate_amino_acid_composition_plot(_records):
+def generate_streamed_distribution_plot(histogram, title, x_label, nbins=50, height=500, title_x=0.35):
+    """Generate a histogram plot from a fixed-size streaming histogram"""
+    return build_binned_histogram_figure(histogram.binned, title, x_label, nbins, height, title_x)
+
+def generate_amino_acid_composition_plot(aa_counts):
     """Generate overall amino acid composition plot"""
-    all_sequences = "".join(str(record.seq) for record in _records)
-    aa_counts = Counter(all_sequences)
     aa_df = pd.DataFrame(list(aa_counts.items()), 
                         columns=["Amino Acid", "Count"])
     aa_df = aa_df.sort_values("Amino Acid", ascending=True)
@@ -162,10 +268,9 @@ def generate_amino_acid_composition_plot(_records):
     _add_grid_styling(fig)
     return fig
 
-@st.cache_data(ttl=timedelta(hours=24))
-def generate_version_distribution_plot(df, column, title, x_label):
-    """Generate distribution plot for SV or PE levels"""
-    counts = df[column].value_counts().sort_index()
+def generate_version_distribution_plot(counts, column, title, x_label):
+    """Generate distribution plot for SV or PE levels from their value counts"""
+    counts = counts.sort_index()
     plot_df = pd.DataFrame({f'{column} Level': counts.index, 'Count': counts.values})
     
     fig = px.bar(
@@ -194,10 +299,9 @@ def generate_version_distribution_plot(df, column, title, x_label):
     _add_grid_styling(fig)
     return fig
 
-@st.cache_data(ttl=timedelta(hours=24))
-def generate_organism_distribution_plot(df):
-    """Generate top 30 organisms distribution plot"""
-    os_counts = df['OS'].value_counts().head(30)
+def generate_organism_distribution_plot(os_counts):
+    """Generate top 30 organisms distribution plot from organism counts, most common first"""
+    os_counts = os_counts.head(30)
     os_df = os_counts.reset_index()
     os_df.columns = ['Organism', 'Count']
     
@@ -226,7 +330,6 @@ def generate_organism_distribution_plot(df):
     _add_grid_styling(fig)
     return fig
 
-@st.cache_data(ttl=timedelta(hours=24))
 def generate_secondary_structure_plot(analysis):
     """Generate secondary structure prediction pie chart"""
     fig = go.Figure(data=[go.Pie(
@@ -255,12 +358,22 @@ def generate_secondary_structure_plot(analysis):
     )
     return fig
 
-@st.cache_data(ttl=timedelta(hours=24))
-def generate_flexibility_plot(analysis):
-    """Generate flexibility profile plot"""
+@cache_data(ttl=timedelta(hours=24))
+def get_sequence_profile(sequence, scale, window):
+    """Compute a sliding-window profile and downsample it to a bounded number of points"""
+    profile_func, title, y_label = PROFILE_SCALES[scale]
+    positions, scores = profile_func(sequence, window)
+    positions, scores = downsample_lttb(positions, scores, MAX_PROFILE_POINTS)
+    return {'positions': positions, 'scores': scores, 'title': title, 'y_label': y_label}
+
+def generate_profile_plot(profile):
+    """Generate sliding-window profile plot"""
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        y=analysis['flexibility'],
+    # Long profiles are drawn with WebGL instead of one SVG path per point
+    scatter = go.Scattergl if len(profile['positions']) > WEBGL_POINT_THRESHOLD else go.Scatter
+    fig.add_trace(scatter(
+        x=profile['positions'],
+        y=profile['scores'],
         fill='tozeroy',
         fillcolor='rgba(66, 214, 79, 0.35)',
         line=dict(color='#42d64f', width=2)
@@ -268,15 +381,14 @@ def generate_flexibility_plot(analysis):
     fig.update_layout(
         template=create_plotly_template(),
         xaxis_title="Position",
-        yaxis_title="Flexibility Score",
+        yaxis_title=profile['y_label'],
         height=600,
-        title="Flexibility Profile",
+        title=profile['title'],
         title_x=0.45
     )
     _add_grid_styling(fig)
     return fig
 
-@st.cache_data(ttl=timedelta(hours=24))
 def generate_specific_aa_composition_plot(analysis):
     """Generate amino acid composition plot for specific protein"""
     aa_comp = pd.DataFrame(analysis['aa_composition'].items(),
@@ -306,7 +418,6 @@ def generate_specific_aa_composition_plot(analysis):
     _add_grid_styling(fig)
     return fig
 
-@st.cache_data(ttl=timedelta(hours=24))
 def _add_grid_styling(fig):
     """Add common grid styling to plots"""
     fig.update_xaxes(
@@ -322,29 +433,65 @@ def _add_grid_styling(fig):
         showgrid=True
     )
 
-@st.cache_data(ttl=timedelta(hours=24))
-def generate_general_tab_plots(_stats, _df, _records):
-    """Generate all plots for the general statistics tab"""
-    plots = {
-        'length_dist': generate_length_distribution_plot(_stats['lengths']),
-        'sv_dist': generate_version_distribution_plot(_df, 'SV', "Sequence Version (SV) Distribution", "SV Level"),
-        'aa_comp': generate_amino_acid_composition_plot(_records),
-        'pe_dist': generate_version_distribution_plot(_df, 'PE', "Protein Evidence (PE) Level Distribution", "PE Level"),
-        'organism_dist': generate_organism_distribution_plot(_df)
-    }
-    return plots
-
-@st.cache_data(ttl=timedelta(hours=24))
-def generate_specific_protein_plots(analysis):
-    """Generate all plots for specific protein analysis"""
-    plots = {
-        'secondary_structure': generate_secondary_structure_plot(analysis),
-        'flexibility': generate_flexibility_plot(analysis),
-        'aa_composition': generate_specific_aa_composition_plot(analysis)
-    }
-    return plots
+def serialize_figures(figures):
+    """Serialize finished figures to Plotly JSON, the form every cache holds them in"""
+    with stage(METRICS_PAGE, "figure_serialization"):
+        return {key: fig.to_json() for key, fig in figures.items()}
+
+@st.cache_resource(ttl=timedelta(hours=24), max_entries=256)
+def load_figure(spec):
+    """Materialize a serialized figure once per process; rendering only reads it"""
+    return pio.from_json(spec)
+
+def render_figure(spec):
+    """Render a pre-serialized figure"""
+    record_payload(METRICS_PAGE, "figure", spec)
+    st.plotly_chart(load_figure(spec), use_container_width=True)
+
+@cache_data(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def generate_general_tab_plots(dataset, _stats, _df):
+    """Generate all plots for the general statistics tab as serialized figures"""
+    summary = _stats['summary']
+    with stage(METRICS_PAGE, "plot_build"):
+        plots = {
+            'length_dist': generate_length_distribution_plot(_stats['lengths']),
+            'sv_dist': generate_version_distribution_plot(summary.value_counts('SV'), 'SV', "Sequence Version (SV) Distribution", "SV Level"),
+            'aa_comp': generate_amino_acid_composition_plot(_stats['aa_counts']),
+            'pe_dist': generate_version_distribution_plot(summary.value_counts('PE'), 'PE', "Protein Evidence (PE) Level Distribution", "PE Level"),
+            'organism_dist': generate_organism_distribution_plot(summary.value_counts('OS'))
+        }
+        properties = _stats['properties']
+        for column, key, title, x_label in PROPERTY_PLOTS:
+            plots[key] = generate_property_distribution_plot(properties[column].to_numpy(), title, x_label)
+    return serialize_figures(plots)
+
+def generate_summary_plots(summary):
+    """Generate the general tab plots from a dataset summary alone, as serialized figures"""
+    with stage(METRICS_PAGE, "plot_build"):
+        plots = {
+            'length_dist': generate_streamed_distribution_plot(
+                summary.histograms['Length'], "Sequence Length Distribution", "Sequence Length", height=700, title_x=0.45
+            ),
+            'sv_dist': generate_version_distribution_plot(summary.value_counts('SV'), 'SV', "Sequence Version (SV) Distribution", "SV Level"),
+            'aa_comp': generate_amino_acid_composition_plot(counts_to_dict(summary.aa_counts)),
+            'pe_dist': generate_version_distribution_plot(summary.value_counts('PE'), 'PE', "Protein Evidence (PE) Level Distribution", "PE Level"),
+            'organism_dist': generate_organism_distribution_plot(summary.value_counts('OS'))
+        }
+        for column, key, title, x_label in PROPERTY_PLOTS:
+            plots[key] = generate_streamed_distribution_plot(summary.histograms[column], title, x_label)
+    return serialize_figures(plots)
+
+@cache_data(ttl=timedelta(hours=24))
+def generate_specific_protein_plots(analysis, profile):
+    """Generate all plots for specific protein analysis as serialized figures"""
+    with stage(METRICS_PAGE, "plot_build"):
+        plots = {
+            'secondary_structure': generate_secondary_structure_plot(analysis),
+            'profile': generate_profile_plot(profile),
+            'aa_composition': generate_specific_aa_composition_plot(analysis)
+        }
+    return serialize_figures(plots)
 
-@st.cache_data(ttl=timedelta(hours=24))
 def render_general_tab_content(stats, plots):
     """Render all content for the general statistics tab"""
     st.header("File Overview")
@@ -368,20 +515,103 @@ def render_general_tab_content(stats, plots):
     plot_col1, plot_col2 = st.columns(2)
     
     with plot_col1:
-        st.plotly_chart(plots['length_dist'], use_container_width=True)
-        st.plotly_chart(plots['sv_dist'], use_container_width=True)
+        render_figure(plots['length_dist'])
+        render_figure(plots['sv_dist'])
     
     with plot_col2:
-        st.plotly_chart(plots['aa_comp'], use_container_width=True)
-        st.plotly_chart(plots['pe_dist'], use_container_width=True)
+        render_figure(plots['aa_comp'])
+        render_figure(plots['pe_dist'])
     
     # Display organism distribution plot (full width)
-    st.plotly_chart(plots['organism_dist'], use_container_width=True)
+    render_figure(plots['organism_dist'])
+    
+    # Physicochemical property distributions across all proteins
+    st.markdown("<h2 style='text-align: center;'>⚗️ Physicochemical Properties</h2>", unsafe_allow_html=True)
+    property_cols = st.columns(3)
+    for i, (_, key, _, _) in enumerate(PROPERTY_PLOTS):
+        with property_cols[i % 3]:
+            render_figure(plots[key])
+    
+    # Every chart is pre-aggregated, so this stays flat as the dataset grows
+    payloads = {key: len(spec) for key, spec in plots.items()}
+    largest = max(payloads, key=payloads.get)
+    st.caption(
+        f"Chart payload: {sum(payloads.values()) / 1024:.1f} KiB across {len(payloads)} charts "
+        f"(largest: {largest}, {payloads[largest] / 1024:.1f} KiB; cap {MAX_FIGURE_PAYLOAD_BYTES // 1024} KiB per chart)"
+    )
 
-@st.cache_data(ttl=timedelta(hours=24))
-def render_specific_tab_content(df, selected_seq_id, analysis, plots):
+def render_redundancy_section(dataset, stats):
+    """Exact and near-duplicate clustering of the loaded dataset, computed on request"""
+    st.markdown("<h2 style='text-align: center;'>🧹 Sequence Redundancy</h2>", unsafe_allow_html=True)
+    identity_col, button_col = st.columns([3, 1])
+    with identity_col:
+        identity = st.slider(
+            "Identity threshold:", min_value=MIN_IDENTITY, max_value=1.0, value=DEFAULT_IDENTITY, step=0.01,
+            help="A sequence joins a cluster when this fraction of its residues is identical in an alignment to the cluster's representative"
+        )
+    with button_col:
+        if st.button("Find duplicate sequences", use_container_width=True):
+            st.session_state.dedup_identity = identity
+    
+    identity = st.session_state.get('dedup_identity')
+    if identity is None:
+        st.caption("Exact duplicates are found by sequence hash; near-duplicates by greedy, CD-HIT-style clustering with a k-mer filter.")
+        return
+    with st.spinner(f"Clustering sequences at {identity:.0%} identity..."):
+        assignments, summary = cluster_dataset(dataset, stats, identity)
+    
+    redundant = len(assignments) - len(summary)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        create_metric_container("Exact Duplicates", f"{int(assignments['Exact Duplicate'].sum())}")
+    with col2:
+        create_metric_container("Clusters", f"{len(summary)}")
+    with col3:
+        create_metric_container("Redundant Sequences", f"{redundant}")
+    with col4:
+        create_metric_container("Reduction", f"{redundant / max(len(assignments), 1) * 100:.1f}", "%")
+    st.dataframe(summary.head(20), hide_index=True, use_container_width=True)
+    st.download_button(
+        "Download cluster assignments (CSV)",
+        data=cluster_assignments_csv(dataset, identity, assignments),
+        file_name=f"clusters_{identity:.2f}.csv",
+        mime="text/csv"
+    )
+
+def render_similar_proteins(dataset, stats, selected_seq_id, similar):
+    """k-mer shortlist of similar proteins, with alignment columns when affordable or requested"""
+    st.markdown("<h2 style='text-align: center;'>🧩 Similar Proteins</h2>", unsafe_allow_html=True)
+    if similar.empty:
+        st.info("No protein in this file shares enough k-mers with the selected one.")
+        return
+
+    position = get_row_index(dataset, stats['dataframe'])[selected_seq_id]
+    query_length = int(stats['encoded'].lengths[position])
+    cells = query_length * int(similar['Length'].sum())
+    alignable = cells <= MAX_ALIGN_CELLS and max(query_length, int(similar['Length'].max())) <= MAX_ALIGN_LENGTH
+    requested = st.session_state.get('aligned_protein') == selected_seq_id
+    if alignable and (cells <= AUTO_ALIGN_CELLS or requested):
+        alignments = align_similar_proteins(dataset, stats, selected_seq_id)
+        similar = add_alignment_columns(similar, alignments)
+
+    st.dataframe(similar, hide_index=True, use_container_width=True)
+    caption = "Ranked by k-mer (4-mer) Jaccard similarity, shortlisted with MinHash sketches of every protein. "
+    if 'Alignment Score' in similar:
+        st.caption(
+            caption + "Score, identity and coverage come from a local BLOSUM62 alignment (gap open 11, extend 1) "
+            "of the selected protein against each hit."
+        )
+    elif alignable:
+        st.caption(caption + f"Aligning this {query_length:,}-residue protein against the hits takes about {cells * ALIGN_SECONDS_PER_CELL:.0f} s.")
+        if st.button("Align against similar proteins"):
+            st.session_state.aligned_protein = selected_seq_id
+            st.rerun()
+    else:
+        st.caption(caption + "The selected protein and its hits are too long to align interactively.")
+
+def render_specific_tab_content(dataset, stats, df, selected_seq_id, analysis, plots, similar):
     """Render all content for the specific protein analysis tab"""
-    selected_row = df[df['ID'] == selected_seq_id].iloc[0]
+    selected_row = get_selected_protein_data(dataset, df, selected_seq_id)
     
     # Metadata section
     st.markdown("<h2 style='text-align: center;'> Metadata</h2>", unsafe_allow_html=True)
@@ -413,29 +643,294 @@ def render_specific_tab_content(df, selected_seq_id, analysis, plots):
     struct_col1, struct_col2 = st.columns(2)
     
     with struct_col1:
-        st.plotly_chart(plots['secondary_structure'], use_container_width=True)
+        render_figure(plots['secondary_structure'])
     
     with struct_col2:
-        st.plotly_chart(plots['flexibility'], use_container_width=True)
+        render_figure(plots['profile'])
     
     # Composition section
-    st.plotly_chart(plots['aa_composition'], use_container_width=True)
+    render_figure(plots['aa_composition'])
+    
+    # Similar proteins section
+    render_similar_proteins(dataset, stats, selected_seq_id, similar)
+
+def create_progress_reporter(progress_bar, fraction, count):
+    """Return a per-shard callback that advances a Streamlit progress bar"""
+    state = {'records': 0}
+    def report(result):
+        state['records'] += count(result)
+        progress_bar.progress(min(fraction(state['records']), 1.0), text=f"Analyzed {state['records']:,} proteins")
+    return report
+
+@st.cache_resource
+def get_result_cache():
+    """Open the on-disk analysis cache shared by every session and server process"""
+    return ResultCache()
+
+def pack_general_results(results):
+    """Serialize (stats, df, plots) for the disk cache; the stats are rebuilt from the table on load"""
+    stats, df, general_plots = results
+    return pack_analysis(df, stats['properties'], general_plots)
 
-@st.cache_data(ttl=timedelta(hours=24))
-def process_and_generate_plots(file_content):
+def load_cached_fasta_results(payload):
+    """Rebuild (stats, df, plots) of a parsed FASTA text from a disk cache entry"""
+    df, properties, general_plots = unpack_analysis(payload)
+    df = compact_table(df)
+    encoded = EncodedSequences.from_arrow(pa.array(df['Sequence'], type=pa.large_string()))
+    summary = DatasetSummary.from_frame(df, composition_counts(encoded), properties)
+    stats = summarize_fasta_dataframe(df, encoded, properties, summary)
+    return stats, df, general_plots
+
+def load_report_results(report_dir):
+    """Build the general statistics of a FASTA file from a report written by the batch CLI"""
+    df, properties, _, summary = load_report(report_dir)
+    encoded = EncodedSequences.from_arrow(pa.array(df['Sequence'], type=pa.large_string()))
+    return summarize_fasta_dataframe(df, encoded, properties, summary)
+
+def load_cached_store_results(payload, store_path, summary):
+    """Rebuild (stats, df, plots) of a sequence store from a disk cache entry"""
+    df, properties, general_plots = unpack_analysis(payload, types_mapper=pd.ArrowDtype)
+    encoded = EncodedSequences.map_arrow(open_sequence_store(store_path).column('Sequence'))
+    stats = summarize_fasta_dataframe(df, encoded, properties, summary)
+    return stats, df, general_plots
+
+def process_and_generate_plots(dataset, workers=1, progress_bar=None):
     """Cache the entire process of parsing, analyzing, and generating plots"""
-    records = parse_fasta_records(file_content)
-    stats = analyze_fasta_file(records)
-    df = stats['dataframe']
-    general_plots = generate_general_tab_plots(stats, df, records)
-    return records, stats, df, general_plots
-
-@st.cache_data(ttl=timedelta(hours=24))
-def get_selected_protein_data(df, selected_seq_id):
-    """Cache the selected protein row lookup"""
-    return df[df['ID'] == selected_seq_id].iloc[0]
-
-@st.cache_data(ttl=timedelta(hours=24))
+    def compute():
+        # Reports precomputed by `python -m proteomics.report` are served as they are
+        report_dir = find_report(dataset.content_digest())
+        if report_dir is not None:
+            with stage(METRICS_PAGE, "report_load"):
+                stats = load_report_results(report_dir)
+            df = stats['dataframe']
+            return stats, df, generate_general_tab_plots(dataset, stats, df)
+
+        # Compressed uploads are decompressed and decoded chunk by chunk while parsing
+        with dataset.open_raw() as raw, open_decompressed(raw) as handle:
+            progress = None
+            if progress_bar is not None:
+                total_size = max(dataset.size(), 1)
+                progress = create_progress_reporter(
+                    progress_bar,
+                    lambda records: raw.tell() / total_size,
+                    lambda shard: len(shard['frame'])
+                )
+            stats = analyze_fasta_file(iter_fasta_batches(handle), workers=workers, progress=progress)
+        df = stats['dataframe']
+        general_plots = generate_general_tab_plots(dataset, stats, df)
+        return stats, df, general_plots
+
+    # Cached on disk rather than with st.cache_data, whose replay of a hit
+    # cannot reach the progress bar this run drives; keyed by the content of the file
+    key = cache_key(dataset.content_digest(), "fasta")
+    return get_result_cache().get_or_compute(key, compute, pack_general_results, load_cached_fasta_results)
+
+def process_and_generate_plots_from_store(dataset, workers=1, progress_bar=None):
+    """Build (once) and memory-map the Arrow store for a FASTA file, analyzing it through the disk cache"""
+    with stage(METRICS_PAGE, "sequence_store"):
+        store_path = ensure_sequence_store(dataset.path, workers=workers)
+        load_fasta_index(dataset)
+    # The summary checkpoint only parses records appended since it was last saved
+    with stage(METRICS_PAGE, "summary_checkpoint"):
+        summary, _ = update_summary(dataset.path)
+
+    def compute():
+        progress = None
+        if progress_bar is not None:
+            total_sequences = max(read_store_metadata(store_path)['total_sequences'], 1)
+            progress = create_progress_reporter(
+                progress_bar,
+                lambda records: records / total_sequences,
+                len
+            )
+        # A precomputed report spares recomputing the property table
+        report_dir = find_report(dataset.content_digest())
+        properties = load_report_properties(report_dir) if report_dir is not None else None
+        stats = analyze_sequence_store(store_path, summary, workers=workers, progress=progress, properties=properties)
+        df = stats['dataframe']
+        general_plots = generate_general_tab_plots(dataset, stats, df)
+        return stats, df, general_plots
+
+    # Like process_and_generate_plots, memoized on disk only so no hit replays the progress bar
+    key = cache_key(dataset.content_digest(), "store")
+    return get_result_cache().get_or_compute(
+        key, compute, pack_general_results,
+        lambda payload: load_cached_store_results(payload, store_path, summary)
+    )
+
+def shard_fingerprint(path):
+    """(path, size, mtime) of every FASTA file behind a file or shard directory path"""
+    return tuple(
+        (shard, os.stat(shard).st_size, os.stat(shard).st_mtime_ns) for shard in fasta_paths(path)
+    )
+
+def summary_stats(summary):
+    """General statistics of a dataset known only by its mergeable summary"""
+    stats = summary.stats()
+    stats.update({'aa_counts': counts_to_dict(summary.aa_counts), 'summary': summary})
+    return stats
+
+def pack_summary_results(results):
+    """Serialize (stats, plots) of an out-of-core summary for the disk cache"""
+    stats, plots = results
+    return json.dumps({'summary': stats['summary'].to_dict(), 'plots': plots}).encode('utf-8')
+
+def load_cached_summary_results(payload):
+    data = json.loads(payload)
+    return summary_stats(DatasetSummary.from_dict(data['summary'])), data['plots']
+
+def summarize_out_of_core(fingerprint, workers=1, progress_bar=None):
+    """Walk a FASTA file or shard directory once, keeping only fixed-size sketches and histograms"""
+    def compute():
+        shards = FastaShards([shard for shard, _, _ in fingerprint])
+        progress = None
+        if progress_bar is not None:
+            progress = create_progress_reporter(progress_bar, lambda records: shards.fraction(), len)
+        with stage(METRICS_PAGE, "streaming_summary"):
+            summary = summarize_fasta_shards(shards, workers=workers, progress=progress)
+        return summary_stats(summary), generate_summary_plots(summary)
+
+    # Cached on disk rather than with st.cache_data, whose replay of a hit
+    # cannot reach the progress bar this run drives; keyed by path, size and mtime
+    key = cache_key(hash_bytes(json.dumps(fingerprint).encode('utf-8')), "summary")
+    return get_result_cache().get_or_compute(key, compute, pack_summary_results, load_cached_summary_results)
+
+@st.cache_resource(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def get_search_index(dataset, _df):
+    """Build (once per dataset) the ID/gene/name/organism search index"""
+    return ProteinSearchIndex.from_dataframe(_df)
+
+@cache_data(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def search_proteins(dataset, _df, query, page):
+    """Return the row positions of one page of search matches and the total match count"""
+    return get_search_index(dataset, _df).search(query, page=page, page_size=DEFAULT_PAGE_SIZE)
+
+def format_protein_option(row):
+    """Label a protein as 'ID · gene · name (organism)', skipping missing fields"""
+    parts = [row['ID']] + [row[column] for column in ('GN', 'Protein Name') if not pd.isna(row[column])]
+    label = " · ".join(str(part) for part in parts)
+    if not pd.isna(row['OS']):
+        label += f" ({row['OS']})"
+    return label
+
+def select_protein(dataset, df):
+    """Search box, page picker and one page of matches; returns the selected ID or None"""
+    search_col, page_col = st.columns([3, 1])
+    with search_col:
+        query = st.text_input(
+            "Search proteins:",
+            placeholder="Protein ID, gene name, protein name or organism (prefix or substring)"
+        )
+    # A new search starts again at page 1
+    if st.session_state.get('search_query') != query:
+        st.session_state.search_query = query
+        st.session_state.search_page = 1
+    with page_col:
+        page = st.number_input("Page:", min_value=1, step=1, key="search_page")
+    positions, total = search_proteins(dataset, df, query, page - 1)
+    if total == 0:
+        st.warning(f"No proteins match '{query}'.")
+        return None
+    pages = -(-total // DEFAULT_PAGE_SIZE)
+    if page > pages:
+        page = pages
+        positions, total = search_proteins(dataset, df, query, page - 1)
+    
+    first = (page - 1) * DEFAULT_PAGE_SIZE
+    st.caption(f"Showing {first + 1:,}–{first + len(positions):,} of {total:,} matches (page {page} of {pages:,})")
+    page_rows = df.iloc[positions]
+    label_ids = {format_protein_option(row): row['ID'] for _, row in page_rows.iterrows()}
+    return label_ids[st.selectbox("Select sequence to analyze:", list(label_ids))]
+
+@st.cache_resource(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def get_row_index(dataset, _df):
+    """Hash index from protein ID to row position, built once per dataset and shared by all lookups"""
+    if dataset.path:
+        fasta_index = load_fasta_index(dataset)
+        if len(fasta_index) == len(_df):
+            # Rows follow file order, so the FASTA index positions are the row positions
+            return fasta_index.positions
+    return first_positions(_df['ID'])
+
+def get_selected_protein_data(dataset, df, selected_seq_id):
+    """Constant-time lookup of the selected protein row through the shared ID index"""
+    return df.iloc[get_row_index(dataset, df)[selected_seq_id]]
+
+@st.cache_resource(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def load_fasta_index(dataset):
+    """Load (building once if needed) the byte-offset index of a FASTA file"""
+    return FastaIndex.open(dataset.path)
+
+@st.cache_resource(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def get_similarity_index(dataset, _stats):
+    """Load or build (once per dataset) the k-mer MinHash sketches behind the similar-protein panel"""
+    encoded = _stats['encoded']
+    with stage(METRICS_PAGE, "similarity_index"):
+        if dataset.path:
+            # Persisted next to the FASTA file, like its store and index
+            return open_similarity_index(dataset.path, encoded)
+        # Uploads have no file to sit next to, so they persist in the disk cache by content
+        key = cache_key(dataset.content_digest(), "sketch")
+        return get_result_cache().get_or_compute(
+            key, lambda: SimilarityIndex.build(encoded), SimilarityIndex.to_bytes, SimilarityIndex.from_bytes
+        )
+
+def similar_protein_positions(dataset, stats, selected_seq_id, top_n=DEFAULT_TOP_N):
+    """Row of the selected protein, and rows and k-mer scores of its most similar proteins"""
+    position = get_row_index(dataset, stats['dataframe'])[selected_seq_id]
+    positions, scores = get_similarity_index(dataset, stats).query(stats['encoded'], position, top_n=top_n)
+    return position, positions, scores
+
+@cache_data(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def find_similar_proteins(dataset, _stats, selected_seq_id, top_n=DEFAULT_TOP_N):
+    """Table of the proteins most similar to the selected one, by k-mer similarity"""
+    _, positions, scores = similar_protein_positions(dataset, _stats, selected_seq_id, top_n)
+    similar = _stats['dataframe'].iloc[positions][['ID', 'Protein Name', 'OS', 'Length']].reset_index(drop=True)
+    similar = similar.rename(columns={'OS': 'Organism'})
+    similar.insert(0, 'k-mer Similarity', np.round(scores, 3))
+    return similar
+
+@cache_data(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def align_similar_proteins(dataset, _stats, selected_seq_id, top_n=DEFAULT_TOP_N):
+    """Align the selected protein against every similar protein in one batch"""
+    position, positions, _ = similar_protein_positions(dataset, _stats, selected_seq_id, top_n)
+    encoded = _stats['encoded']
+    with stage(METRICS_PAGE, "alignment"):
+        return align_batch(encoded[position], [encoded[other] for other in positions])
+
+def add_alignment_columns(similar, alignments):
+    """Insert alignment score, identity and coverage into the similar-protein table"""
+    similar = similar.copy()
+    similar.insert(1, 'Alignment Score', alignments['Score'])
+    for column in ['Identity', 'Query Coverage', 'Target Coverage']:
+        similar.insert(similar.columns.get_loc('ID'), column, np.round(alignments[column], 3))
+    return similar
+
+@cache_data(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def cluster_dataset(dataset, _stats, identity):
+    """Cluster assignments and per-cluster summary of the dataset at one identity threshold"""
+    with stage(METRICS_PAGE, "dedup"):
+        assignments = deduplicate(_stats['dataframe']['ID'], _stats['encoded'], identity)
+    return assignments, cluster_summary(assignments)
+
+@cache_data(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def cluster_assignments_csv(dataset, identity, _assignments):
+    """CSV export of the cluster assignments, encoded once per dataset and threshold"""
+    return _assignments.to_csv(index=False).encode("utf-8")
+
+@cache_data(ttl=timedelta(hours=24), hash_funcs=DATASET_HASH_FUNCS)
+def fetch_protein_sequence(dataset, position):
+    """Seek one sequence from an indexed FASTA file, once per protein"""
+    return load_fasta_index(dataset).fetch_at(position)
+
+def get_protein_sequence(dataset, df, selected_seq_id):
+    """Return the selected sequence, seeking it from disk when the file is indexed"""
+    position = get_row_index(dataset, df)[selected_seq_id]
+    if dataset.path:
+        return fetch_protein_sequence(dataset, position)
+    return df['Sequence'].iloc[position]
+
+@cache_data(ttl=timedelta(hours=24))
 def get_protein_analysis(sequence, protein_id):
     """Cache analysis for individual proteins"""
     return analyze_protein_sequence(sequence)
@@ -446,6 +941,7 @@ def main():
     # Add the sidebar CSS right after page config
     st.markdown(SIDEBAR_CSS, unsafe_allow_html=True)
     st.markdown(MAIN_CSS, unsafe_allow_html=True)
+    start_metrics_server()
     
     # Hide the decoration bar
     hide_decoration_bar_style = '''
@@ -477,8 +973,8 @@ def main():
     # Initialize session state variables
     if 'analysis_done' not in st.session_state:
         st.session_state.analysis_done = False
-    if 'file_content' not in st.session_state:
-        st.session_state.file_content = None
+    if 'upload_dataset' not in st.session_state:
+        st.session_state.upload_dataset = None
     
     # Add an expander for instructions and file upload
     with st.expander("About Proteomic Sequencing Analytics Dashboard", expanded=True):
@@ -506,25 +1002,36 @@ def main():
         st.markdown("<p style='font-size: 1.1em;'>Choose .fasta file source:</p>", unsafe_allow_html=True)
         file_option = st.radio(
             "",
-            ["Use the provided .fasta file", "Upload your own .fasta file"],
+            ["Use the provided .fasta file", "Upload your own .fasta file", "Summarize a large file or shard directory"],
             key="file_source",
             horizontal=True,
             label_visibility="collapsed"
         )
         
         uploaded_file = None
+        default_path = "data/train_sequences.fasta"
+        out_of_core_path = None
         if file_option == "Upload your own .fasta file":
-            uploaded_file = st.file_uploader("Upload your .fasta file", type=['fasta'])
+            uploaded_file = st.file_uploader(
+                f"Upload your .fasta file (.fasta, .fa, .faa, optionally {' or '.join(COMPRESSED_EXTENSIONS)} compressed)",
+                type=FASTA_EXTENSIONS
+            )
             if uploaded_file:
-                file_content = uploaded_file.read().decode("utf-8")
-                st.session_state.file_content = file_content
-        else:
-            # Use default file path
-            default_path = "data/train_sequences.fasta"
-            if os.path.exists(default_path):
-                with open(default_path, 'r') as f:
-                    file_content = f.read()
-                    st.session_state.file_content = file_content
+                # Digest each upload once; later reruns reuse its handle. The raw,
+                # possibly compressed bytes are kept and only decompressed while parsing
+                upload_dataset = st.session_state.upload_dataset
+                if upload_dataset is None or st.session_state.get('upload_file_id') != uploaded_file.file_id:
+                    st.session_state.upload_dataset = DatasetHandle.from_upload(uploaded_file.name, uploaded_file.getvalue())
+                    st.session_state.upload_file_id = uploaded_file.file_id
+        
+        if file_option == "Summarize a large file or shard directory":
+            out_of_core_path = st.text_input(
+                f"Path of a FASTA file or a directory of FASTA shards under the server's {DATA_ROOT}/ directory:",
+                value=".",
+                help="Read once in a single streaming pass; only fixed-size sketches and histograms are kept, "
+                     "so files larger than memory can be summarized. Only the general statistics are available. "
+                     "Set PROTEOMICS_DATA_ROOT to serve another directory."
+            )
         
         # Step 2: Analysis
         st.markdown("""
@@ -541,23 +1048,59 @@ def main():
         # Center the analyze button using columns
         left_col, center_col, right_col = st.columns([1, 1.5, 1])
         with center_col:
+            parallel_mode = st.checkbox(
+                f"Parallel analysis across {DEFAULT_WORKERS} CPU cores",
+                value=False,
+                help="Shard header parsing, property computation and composition across a process pool"
+            )
             analyze_button = st.button("Analyze FASTA File", use_container_width=True)
     
     # Add horizontal line
     st.markdown("---")
     
-    if analyze_button:
-        if st.session_state.file_content:
+    if analyze_button and out_of_core_path is not None:
+        try:
+            workers = DEFAULT_WORKERS if parallel_mode else 1
+            progress_bar = st.progress(0.0, text="Summarizing proteins...")
+            fingerprint = shard_fingerprint(resolve_data_path(out_of_core_path))
+            stats, general_plots = summarize_out_of_core(fingerprint, workers, progress_bar)
+            progress_bar.empty()
+            st.session_state.fasta_stats = stats
+            st.session_state.general_plots = general_plots
+            st.session_state.out_of_core = True
+            st.session_state.analysis_done = True
+        except (OSError, ValueError) as e:
+            st.error(f"Error summarizing FASTA files: {str(e)}")
+            st.session_state.analysis_done = False
+    elif analyze_button:
+        # The default file is only touched once analysis is requested
+        use_default_store = file_option != "Upload your own .fasta file" and os.path.exists(default_path)
+        if use_default_store or (uploaded_file is not None and st.session_state.upload_dataset is not None):
             try:
                 # Center the spinner only during the initial processing
                 col1, spinner_col, col3 = st.columns([1.1, 0.8, 1])
+                workers = DEFAULT_WORKERS if parallel_mode else 1
+                progress_bar = st.progress(0.0, text="Analyzing proteins...")
                 with spinner_col:
-                    records, stats, df, general_plots = process_and_generate_plots(st.session_state.file_content)
+                    if use_default_store:
+                        # The default file is served from its memory-mapped Arrow store
+                        dataset = DatasetHandle.from_path(default_path)
+                        stats, df, general_plots = process_and_generate_plots_from_store(
+                            dataset, workers, progress_bar
+                        )
+                    else:
+                        dataset = st.session_state.upload_dataset
+                        stats, df, general_plots = process_and_generate_plots(
+                            dataset, workers, progress_bar
+                        )
+                progress_bar.empty()
                 
-                st.session_state.fasta_records = records
+                st.session_state.dataset = dataset
                 st.session_state.fasta_stats = stats
                 st.session_state.fasta_df = df
                 st.session_state.general_plots = general_plots
+                st.session_state.dedup_identity = None
+                st.session_state.out_of_core = False
                 st.session_state.analysis_done = True  # Set the analysis flag to True
     
             except Exception as e:
@@ -568,7 +1111,11 @@ def main():
             st.session_state.analysis_done = False
     
     # Check if analysis is done and display the results
-    if st.session_state.analysis_done:
+    if st.session_state.analysis_done and st.session_state.get('out_of_core'):
+        # Out-of-core summaries keep no per-protein records, so only the general tab applies
+        render_general_tab_content(st.session_state.fasta_stats, st.session_state.general_plots)
+        st.info("Summarized out of core: per-protein analysis, search and redundancy need a regular analysis.")
+    elif st.session_state.analysis_done:
         # Create a container to hold all content
         results_container = st.empty()
         
@@ -577,18 +1124,32 @@ def main():
             tab_specific, tab_general = st.tabs(["🔬 Specific Protein Analysis", "📊 General File Statistics"])
             
             with tab_specific:
+                dataset = st.session_state.dataset
                 df = st.session_state.fasta_df
-                selected_seq_id = st.selectbox("Select sequence to analyze:", df['ID'].tolist())
-                selected_row = get_selected_protein_data(df, selected_seq_id)
-                # Use cached analysis for the selected protein
-                analysis = get_protein_analysis(selected_row['Sequence'], selected_seq_id)
-                specific_plots = generate_specific_protein_plots(analysis)
-                render_specific_tab_content(df, selected_seq_id, analysis, specific_plots)
+                selected_seq_id = select_protein(dataset, df)
+                if selected_seq_id is not None:
+                    # Use cached analysis for the selected protein
+                    sequence = get_protein_sequence(dataset, df, selected_seq_id)
+                    analysis = get_protein_analysis(sequence, selected_seq_id)
+                
+                    # Sliding-window profile controls
+                    scale_col, window_col = st.columns(2)
+                    with scale_col:
+                        profile_scale = st.selectbox("Profile scale:", list(PROFILE_SCALES))
+                    with window_col:
+                        profile_window = st.slider("Window size:", min_value=3, max_value=51, value=FLEXIBILITY_WINDOW, step=2)
+                    profile = get_sequence_profile(sequence, profile_scale, profile_window)
+                    specific_plots = generate_specific_protein_plots(analysis, profile)
+                    similar = find_similar_proteins(dataset, st.session_state.fasta_stats, selected_seq_id)
+                    render_specific_tab_content(dataset, st.session_state.fasta_stats, df, selected_seq_id, analysis, specific_plots, similar)
 
             with tab_general:
                 stats = st.session_state.fasta_stats
                 general_plots = st.session_state.general_plots
                 render_general_tab_content(stats, general_plots)
+                render_redundancy_section(st.session_state.dataset, stats)
+
+    render_debug_panel()
 
 
 if __name__ == "__main__":
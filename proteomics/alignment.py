@@ -0,0 +1,235 @@
+import numpy as np
+import pandas as pd
+from Bio.Align import substitution_matrices
+
+from proteomics.encoding import ALPHABET, N_CODES, encode_sequence
+
+# BLAST defaults for proteins: a gap of length L costs GAP_OPEN + GAP_EXTEND * L
+GAP_OPEN = 11
+GAP_EXTEND = 1
+
+# Upper bound on (targets x padded target length) cells per DP batch, small
+# enough that the per-row working arrays stay in cache
+MAX_BATCH_CELLS = 1 << 15
+
+# Code used to pad targets to a common length; scores low enough that no
+# local alignment ever extends into the padding
+PAD_CODE = N_CODES
+PAD_SCORE = -(1 << 16)
+
+# Alignment statistics travel through the DP packed in one uint64 per cell:
+# query start | target start | aligned residue pairs | identities, 16 bits each
+_FIELD_BITS = 16
+MAX_ALIGN_LENGTH = (1 << _FIELD_BITS) - 1
+
+# Bits that hold the column index in the packed (value, column) prefix maxima
+_COLUMN_BITS = 24
+
+ALIGNMENT_COLUMNS = (
+    "Score",
+    "Identity",
+    "Identities",
+    "Alignment Length",
+    "Query Coverage",
+    "Target Coverage",
+    "Query Start",
+    "Query End",
+    "Target Start",
+    "Target End",
+)
+
+
+def _substitution_table():
+    """BLOSUM62 over residue codes; letters it lacks (J, O, U, unknown) score as X"""
+    blosum = substitution_matrices.load("BLOSUM62")
+    letters = [letter if letter in blosum.alphabet else "X" for letter in ALPHABET] + ["X"]
+    table = np.full((N_CODES + 1, N_CODES + 1), PAD_SCORE, dtype=np.int32)
+    for i, a in enumerate(letters):
+        for j, b in enumerate(letters):
+            table[i, j] = int(blosum[a, b])
+    return table
+
+
+SUBSTITUTION_TABLE = _substitution_table()
+
+# Stats increment of a diagonal step: one more aligned pair, plus one identity on a match
+PAIR_INCREMENT_TABLE = (
+    np.uint64(1 << _FIELD_BITS) + np.eye(N_CODES + 1, dtype=np.uint64)
+)
+
+
+def _pad_sequences(sequences):
+    lengths = np.array([len(sequence) for sequence in sequences], dtype=np.int64)
+    padded = np.full((len(sequences), max(int(lengths.max()), 1)), PAD_CODE, dtype=np.uint8)
+    for row, sequence in enumerate(sequences):
+        padded[row, :len(sequence)] = sequence
+    return padded, lengths
+
+
+def _start_word(query_position, target_positions):
+    return (np.uint64(query_position) << np.uint64(3 * _FIELD_BITS)) | (
+        target_positions.astype(np.uint64) << np.uint64(2 * _FIELD_BITS)
+    )
+
+
+def _align_batch(query, padded):
+    """
+    Smith-Waterman with affine gaps of a query against a batch of padded
+    targets. The query is either one code array shared by every target, or
+    a (targets, query length) array of padded queries, one per target. The
+    DP runs row by row over the query; each row is computed for every
+    target and column at once. Horizontal gaps are resolved with
+    a running maximum along the row, which is exact whenever opening a gap
+    costs at least as much as extending one. The start cell, aligned pairs
+    and identities ride along in a packed stats word, so no traceback is
+    needed. Returns (best score, stats word, end cell) per target.
+    """
+    batch, n = padded.shape
+    first_gap = GAP_OPEN + GAP_EXTEND
+    columns = np.arange(n, dtype=np.int64)
+    column_mask = (1 << _COLUMN_BITS) - 1
+    gap_ramp = GAP_EXTEND * columns
+
+    # Previous row of H (columns 1..n; column 0 is always 0) and its stats
+    H = np.zeros((batch, n), dtype=np.int32)
+    HS = np.broadcast_to(_start_word(0, columns + 1), (batch, n)).copy()
+    # Vertical gap state (a gap in the target) and its stats
+    E = np.full((batch, n), np.iinfo(np.int32).min // 2, dtype=np.int32)
+    ES = np.zeros((batch, n), dtype=np.uint64)
+
+    best = np.zeros(batch, dtype=np.int32)
+    best_stats = np.zeros(batch, dtype=np.uint64)
+    best_end = np.zeros((batch, 2), dtype=np.int64)
+
+    shared = query.ndim == 1
+    for i in range(1, query.shape[-1] + 1):
+        if shared:
+            substitution = SUBSTITUTION_TABLE[query[i - 1]][padded]
+            increment = PAIR_INCREMENT_TABLE[query[i - 1]][padded]
+        else:
+            residues = query[:, i - 1, None]
+            substitution = SUBSTITUTION_TABLE[residues, padded]
+            increment = PAIR_INCREMENT_TABLE[residues, padded]
+
+        # Vertical gaps: extend E from above, or open one from H above
+        np.subtract(E, GAP_EXTEND, out=E)
+        open_e = H - first_gap
+        use_open = open_e >= E
+        np.copyto(E, open_e, where=use_open)
+        np.copyto(ES, HS, where=use_open)
+
+        # Diagonal step from the previous row and column (column 0 holds 0 and a fresh start)
+        diag = np.empty_like(H)
+        diag[:, 0] = 0
+        diag[:, 1:] = H[:, :-1]
+        diag += substitution
+        diag_stats = np.empty_like(HS)
+        diag_stats[:, 0] = _start_word(i - 1, np.zeros(1, dtype=np.int64))[0]
+        diag_stats[:, 1:] = HS[:, :-1]
+        diag_stats += increment
+
+        N = np.maximum(diag, E)
+        NS = np.where(diag >= E, diag_stats, ES)
+        np.maximum(N, 0, out=N)
+        # A cell at 0 restarts: a diagonal step from it begins at residues (i, j + 1)
+        np.copyto(NS, _start_word(i, columns + 1), where=N == 0)
+
+        # Horizontal gaps: F[j] = max over k < j of N[k] - GAP_OPEN - GAP_EXTEND * (j - k)
+        packed = ((N + gap_ramp) << _COLUMN_BITS) | columns
+        np.maximum.accumulate(packed, axis=1, out=packed)
+        F = np.empty_like(N)
+        F[:, 0] = -1
+        F[:, 1:] = (packed[:, :-1] >> _COLUMN_BITS) - GAP_OPEN - GAP_EXTEND * columns[1:]
+        use_f = F > N
+        H = np.where(use_f, F, N)
+        source = np.empty_like(packed)
+        source[:, 0] = 0
+        source[:, 1:] = packed[:, :-1] & column_mask
+        HS = np.where(use_f, np.take_along_axis(NS, source, axis=1), NS)
+
+        # Keep the first best-scoring cell of every target
+        row_best = H.max(axis=1)
+        better = np.flatnonzero(row_best > best)
+        if len(better):
+            end = H[better].argmax(axis=1)
+            best[better] = row_best[better]
+            best_stats[better] = HS[better, end]
+            best_end[better, 0] = i
+            best_end[better, 1] = end + 1
+
+    return best, best_stats, best_end
+
+
+def _encode(sequence):
+    return encode_sequence(sequence) if isinstance(sequence, str) else np.asarray(sequence)
+
+
+def _align(queries, targets):
+    """Align queries[k] against targets[k] for every k; a single query array is shared by all targets"""
+    shared = not isinstance(queries, list)
+    result = pd.DataFrame(0, index=pd.RangeIndex(len(targets)), columns=list(ALIGNMENT_COLUMNS), dtype=np.float64)
+    if not targets:
+        return result
+    query_lengths = np.full(len(targets), len(queries)) if shared else np.array([len(q) for q in queries])
+    target_lengths = np.array([len(target) for target in targets], dtype=np.int64)
+    if max(int(query_lengths.max()), int(target_lengths.max())) > MAX_ALIGN_LENGTH:
+        raise ValueError(f"Batch alignment supports sequences of up to {MAX_ALIGN_LENGTH} residues")
+
+    # Similar lengths share a batch, so little work is spent on padding
+    order = np.lexsort((target_lengths, query_lengths))
+    start = 0
+    while start < len(order):
+        width = max(int(target_lengths[order[start]]), 1)
+        stop = start + 1
+        while stop < len(order):
+            width_next = max(width, int(target_lengths[order[stop]]))
+            if (stop - start + 1) * width_next > MAX_BATCH_CELLS:
+                break
+            width = width_next
+            stop += 1
+        chunk = order[start:stop]
+        padded, chunk_lengths = _pad_sequences([targets[index] for index in chunk])
+        query = queries if shared else _pad_sequences([queries[index] for index in chunk])[0]
+        score, stats, last = _align_batch(query, padded)
+
+        field = np.uint64(MAX_ALIGN_LENGTH)
+        q_start = (stats >> np.uint64(3 * _FIELD_BITS)).astype(np.int64)
+        t_start = ((stats >> np.uint64(2 * _FIELD_BITS)) & field).astype(np.int64)
+        pairs = ((stats >> np.uint64(_FIELD_BITS)) & field).astype(np.int64)
+        matches = (stats & field).astype(np.int64)
+        # End cells are 1-based, starts 0-based, so the differences are the spans
+        q_end, t_end = last[:, 0], last[:, 1]
+        aligned = (q_end - q_start) + (t_end - t_start) - pairs
+        found = score > 0
+        result.loc[chunk, "Score"] = score
+        result.loc[chunk, "Identity"] = np.where(found, matches / np.maximum(aligned, 1), 0.0)
+        result.loc[chunk, "Identities"] = np.where(found, matches, 0)
+        result.loc[chunk, "Alignment Length"] = np.where(found, aligned, 0)
+        result.loc[chunk, "Query Coverage"] = np.where(found, (q_end - q_start) / np.maximum(query_lengths[chunk], 1), 0.0)
+        result.loc[chunk, "Target Coverage"] = np.where(found, (t_end - t_start) / np.maximum(chunk_lengths, 1), 0.0)
+        result.loc[chunk, "Query Start"] = np.where(found, q_start + 1, 0)
+        result.loc[chunk, "Query End"] = np.where(found, q_end, 0)
+        result.loc[chunk, "Target Start"] = np.where(found, t_start + 1, 0)
+        result.loc[chunk, "Target End"] = np.where(found, t_end, 0)
+        start = stop
+
+    integer_columns = ["Score", "Identities", "Alignment Length", "Query Start", "Query End", "Target Start", "Target End"]
+    result[integer_columns] = result[integer_columns].astype(np.int64)
+    return result
+
+
+def align_batch(query, targets):
+    """
+    Locally align one sequence against many with BLOSUM62 and affine gaps.
+    Sequences may be strings or residue code arrays. Returns a DataFrame
+    with one row per target, in input order: score, identity over the
+    aligned columns, coverage of query and target, and 1-based end points.
+    """
+    return _align(_encode(query), [_encode(target) for target in targets])
+
+
+def align_pairs(queries, targets):
+    """Like align_batch, but aligns queries[k] against targets[k], many different queries in one batch"""
+    if len(queries) != len(targets):
+        raise ValueError("align_pairs needs one target per query")
+    return _align([_encode(query) for query in queries], [_encode(target) for target in targets])
@@ -0,0 +1,89 @@
+import io
+import mmap
+import os
+
+from proteomics.fasta_stream import open_decompressed
+from proteomics.result_cache import hash_bytes, hash_file
+
+
+def source_fingerprint(path):
+    """Size and mtime of a file, which files derived from it record to tell when they are stale"""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class DatasetHandle:
+    """
+    Cheap reference to a FASTA dataset that cached functions key on instead
+    of its content. Files are fingerprinted by path, size and mtime; uploads
+    by a digest of their raw (possibly compressed) bytes that is computed
+    once, when the handle is created. Equal fingerprints mean equal datasets.
+    """
+
+    def __init__(self, name, fingerprint, path=None, data=None, digest=None):
+        self.name = name
+        self.fingerprint = fingerprint
+        self.path = path
+        self.data = data
+        self._digest = digest
+
+    @classmethod
+    def from_path(cls, path):
+        """Reference a FASTA file on disk"""
+        path = os.path.abspath(path)
+        source = source_fingerprint(path)
+        return cls(
+            os.path.basename(path),
+            f"file:{path}:{source['size']}:{source['mtime_ns']}",
+            path=path,
+        )
+
+    @classmethod
+    def from_upload(cls, name, data):
+        """Reference uploaded FASTA bytes held in memory, plain or compressed"""
+        digest = hash_bytes(data)
+        return cls(name, f"upload:{digest}", data=data, digest=digest)
+
+    def content_digest(self):
+        """SHA-256 of the dataset content, hashed on first use for files"""
+        if self._digest is None:
+            self._digest = hash_file(self.path)
+        return self._digest
+
+    def size(self):
+        """Size in bytes of the raw, possibly compressed, dataset"""
+        if self.data is not None:
+            return len(self.data)
+        return os.path.getsize(self.path)
+
+    def open(self):
+        """Open the dataset as a binary stream, decompressing gzip or zstd on the fly"""
+        return open_decompressed(self.open_raw())
+
+    def open_raw(self):
+        """
+        Open the raw bytes of the dataset. Uploads are read from memory; files
+        are memory-mapped, so nothing is read until the pipeline pulls chunks.
+        """
+        if self.data is not None:
+            return io.BytesIO(self.data)
+        with open(self.path, "rb") as f:
+            try:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return open(self.path, "rb")
+
+    def __eq__(self, other):
+        return isinstance(other, DatasetHandle) and self.fingerprint == other.fingerprint
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    def __repr__(self):
+        return f"DatasetHandle({self.name!r}, {self.fingerprint!r})"
+
+
+def dataset_cache_key(dataset):
+    """Streamlit hash_funcs entry: a handle hashes as its fingerprint"""
+    return dataset.fingerprint
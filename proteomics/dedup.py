@@ -0,0 +1,198 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from proteomics.alignment import align_pairs
+from proteomics.encoding import DEFAULT_BLOCK_RESIDUES, N_CODES
+from proteomics.similarity import iter_block_kmers, kmer_ids
+
+DEFAULT_IDENTITY = 0.9
+# Below this the k-mer filter no longer rules anything out, so every pair
+# would have to be aligned
+MIN_IDENTITY = 0.8
+
+# Word size by identity threshold, as in CD-HIT: shorter words keep the
+# filter meaningful as more mismatches are allowed
+WORD_SIZES = ((0.85, 5), (MIN_IDENTITY, 4))
+
+# Representatives aligned per sequence, most shared words first
+MAX_CANDIDATES = 8
+# Sequences whose candidates are gathered and aligned together
+BLOCK_SEQUENCES = 1024
+# Words found in more sequences than this (low-complexity runs) are left
+# out of the filter, which lowers each sequence's required count to match
+MAX_POSTINGS = 5000
+
+DEDUP_COLUMNS = ("ID", "Cluster", "Representative", "Identity", "Exact Duplicate")
+
+
+def sequence_digests(encoded):
+    """128-bit BLAKE2b digest of every sequence's residue codes"""
+    return [hashlib.blake2b(encoded[position].tobytes(), digest_size=16).digest() for position in range(len(encoded))]
+
+
+def exact_duplicate_of(encoded):
+    """Position of the first protein with an identical sequence, for every protein (its own if none)"""
+    first = np.arange(len(encoded))
+    seen = {}
+    for position, digest in enumerate(sequence_digests(encoded)):
+        first[position] = seen.setdefault(digest, position)
+    return first
+
+
+def word_size_for(identity):
+    """Return the k-mer length used to filter candidates at an identity threshold"""
+    if not MIN_IDENTITY <= identity <= 1.0:
+        raise ValueError(f"Identity threshold must be between {MIN_IDENTITY} and 1.0")
+    for threshold, size in WORD_SIZES:
+        if identity >= threshold:
+            return size
+
+
+def _word_index(encoded, rank_of, k, block_residues=DEFAULT_BLOCK_RESIDUES):
+    """
+    Inverted index from k-mer to the ranks of the sequences containing it,
+    as sorted (word << 32 | rank) keys plus the offset of every word's run.
+    """
+    # One key per window at most, written block by block into a single buffer
+    keys = np.empty(len(encoded.codes), dtype=np.int64)
+    filled = 0
+    for ids, owner in iter_block_kmers(encoded, k, block_residues):
+        ranks = rank_of[owner]
+        ranked = ranks >= 0
+        block_keys = np.unique((ids[ranked].astype(np.int64) << 32) | ranks[ranked])
+        keys[filled:filled + len(block_keys)] = block_keys
+        filled += len(block_keys)
+    keys = keys[:filled]
+    keys.sort()
+
+    offsets = np.zeros(N_CODES ** k + 1, dtype=np.int64)
+    for start in range(0, len(keys), block_residues):
+        offsets[1:] += np.bincount(keys[start:start + block_residues] >> 32, minlength=N_CODES ** k)
+    np.cumsum(offsets, out=offsets)
+    return offsets, keys
+
+
+def _gather(offsets, keys, words, counts):
+    """Leading counts[i] ranks of each word's run; returns (ranks, owning word index)"""
+    starts = offsets[words]
+    owner = np.repeat(np.arange(len(words)), counts)
+    within = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return keys[starts[owner] + within] & 0xFFFFFFFF, owner
+
+
+def cluster_sequences(encoded, identity=DEFAULT_IDENTITY, block_sequences=BLOCK_SEQUENCES):
+    """
+    Greedy CD-HIT-style clustering. Exact duplicates are collapsed by
+    digest first. The remaining sequences are visited longest first; each
+    joins the first representative it matches at >= identity (identical
+    residues over its own length), or becomes a representative itself.
+    Candidates must share enough k-mers to possibly reach the threshold,
+    since every mismatch breaks at most k words; as in CD-HIT, an insertion
+    in the longer sequence can still hide a match. Returns (cluster id,
+    representative position, identity to it, exact duplicate flag) arrays.
+    """
+    k = word_size_for(identity)
+    n = len(encoded)
+    duplicate_of = exact_duplicate_of(encoded)
+    unique = np.flatnonzero(duplicate_of == np.arange(n))
+    lengths = encoded.lengths
+    # Longest first, file order among equal lengths
+    ranked = unique[np.argsort(-lengths[unique], kind="stable")]
+    rank_of = np.full(n, -1, dtype=np.int64)
+    rank_of[ranked] = np.arange(len(ranked))
+    offsets, keys = _word_index(encoded, rank_of, k)
+    posting_counts = np.diff(offsets)
+    # Runs are in rank order, so the sequences visited so far are a prefix of each run
+    visited = np.zeros(len(posting_counts), dtype=np.int64)
+
+    is_representative = np.zeros(len(ranked), dtype=bool)
+    representative = np.arange(len(ranked))
+    best_identity = np.ones(len(ranked))
+
+    for block_start in range(0, len(ranked), block_sequences):
+        block = np.arange(block_start, min(block_start + block_sequences, len(ranked)))
+        block_words, query_words, query_owner = [], [], []
+        required = np.zeros(len(block), dtype=np.int64)
+        for local, rank in enumerate(block):
+            words = np.unique(kmer_ids(encoded[ranked[rank]], k))
+            block_words.append(words)
+            common = posting_counts[words] > MAX_POSTINGS
+            length = lengths[ranked[rank]]
+            mismatches = length - int(np.ceil(identity * length - 1e-9))
+            required[local] = max(len(words) - mismatches * k - int(common.sum()), 1)
+            query_words.append(words[~common])
+            query_owner.append(np.full(int((~common).sum()), local))
+        query_words = np.concatenate(query_words)
+        query_owner = np.concatenate(query_owner)
+        words, counts = np.unique(np.concatenate(block_words), return_counts=True)
+        visited[words] += counts
+
+        # Shared word counts with every longer sequence that may still be a representative
+        others, word_index = _gather(offsets, keys, query_words, visited[query_words])
+        queries = query_owner[word_index]
+        keep = (others < block[queries]) & ((others >= block_start) | is_representative[others])
+        pair_keys, shared = np.unique(queries[keep] * len(ranked) + others[keep], return_counts=True)
+        pair_queries, pair_others = pair_keys // len(ranked), pair_keys % len(ranked)
+        passing = shared >= required[pair_queries]
+        pair_queries, pair_others, shared = pair_queries[passing], pair_others[passing], shared[passing]
+        order = np.lexsort((pair_others, -shared, pair_queries))
+        pair_queries, pair_others = pair_queries[order], pair_others[order]
+        slot = np.arange(len(pair_queries)) - np.searchsorted(pair_queries, pair_queries)
+        pair_queries, pair_others = pair_queries[slot < MAX_CANDIDATES], pair_others[slot < MAX_CANDIDATES]
+
+        alignments = align_pairs(
+            [encoded[ranked[block[local]]] for local in pair_queries],
+            [encoded[ranked[other]] for other in pair_others],
+        )
+        pair_identity = alignments["Identities"].to_numpy() / np.maximum(lengths[ranked[block[pair_queries]]], 1)
+
+        # Resolve in rank order, so earlier sequences of the block are settled first
+        bounds = np.searchsorted(pair_queries, np.arange(len(block) + 1))
+        for local, rank in enumerate(block):
+            for pair in range(bounds[local], bounds[local + 1]):
+                other = pair_others[pair]
+                if is_representative[other] and pair_identity[pair] >= identity:
+                    representative[rank] = other
+                    best_identity[rank] = pair_identity[pair]
+                    break
+            else:
+                is_representative[rank] = True
+
+    # Map back to file positions; clusters are numbered in representative order
+    cluster_of_rank = np.cumsum(is_representative) - 1
+    cluster = np.empty(n, dtype=np.int64)
+    rep_position = np.empty(n, dtype=np.int64)
+    identity_to_rep = np.empty(n)
+    cluster[ranked] = cluster_of_rank[representative]
+    rep_position[ranked] = ranked[representative]
+    identity_to_rep[ranked] = best_identity
+    cluster[:] = cluster[duplicate_of]
+    rep_position[:] = rep_position[duplicate_of]
+    identity_to_rep[:] = identity_to_rep[duplicate_of]
+    return cluster, rep_position, identity_to_rep, duplicate_of != np.arange(n)
+
+
+def deduplicate(ids, encoded, identity=DEFAULT_IDENTITY):
+    """Cluster assignments of every protein as a DataFrame with its cluster's representative ID"""
+    ids = np.asarray(ids, dtype=object)
+    cluster, rep_position, identity_to_rep, exact = cluster_sequences(encoded, identity)
+    return pd.DataFrame({
+        "ID": ids,
+        "Cluster": cluster,
+        "Representative": ids[rep_position],
+        "Identity": np.round(identity_to_rep, 3),
+        "Exact Duplicate": exact,
+    }, columns=list(DEDUP_COLUMNS))
+
+
+def cluster_summary(assignments):
+    """Cluster sizes with their representative, largest first"""
+    summary = assignments.groupby(["Cluster", "Representative"], sort=False).agg(
+        Members=("ID", "size"),
+        Exact_Duplicates=("Exact Duplicate", "sum"),
+        Min_Identity=("Identity", "min"),
+    ).reset_index()
+    summary = summary.rename(columns={"Exact_Duplicates": "Exact Duplicates", "Min_Identity": "Min Identity"})
+    return summary.sort_values(["Members", "Cluster"], ascending=[False, True], ignore_index=True)
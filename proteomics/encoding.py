@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# The 20 standard residues take codes 0-19, the remaining IUPAC letters
+# (B, J, O, U, X, Z) follow, and anything else shares a final code
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+ALPHABET = AMINO_ACIDS + "BJOUXZ"
+UNKNOWN_CODE = len(ALPHABET)
+N_CODES = UNKNOWN_CODE + 1
+
+ENCODE_TABLE = np.full(256, UNKNOWN_CODE, dtype=np.uint8)
+for _code, _letter in enumerate(ALPHABET):
+    ENCODE_TABLE[ord(_letter)] = _code
+    ENCODE_TABLE[ord(_letter.lower())] = _code
+
+# Upper bound on residues handled per block by the per-protein reductions
+DEFAULT_BLOCK_RESIDUES = 1 << 22
+
+
+def _arrow_buffers(array):
+    """Offsets (int64, rebased to 0) and raw bytes of one Arrow (large_)string array, without copying the bytes"""
+    offset_type = np.int64 if pa.types.is_large_string(array.type) else np.int32
+    _, offsets_buffer, data_buffer = array.buffers()
+    offsets = np.frombuffer(offsets_buffer, dtype=offset_type)[array.offset:array.offset + len(array) + 1]
+    offsets = offsets.astype(np.int64)
+    raw = np.frombuffer(data_buffer, dtype=np.uint8)[offsets[0]:offsets[-1]] if data_buffer else np.empty(0, np.uint8)
+    return offsets - offsets[0], raw
+
+
+class MappedResidues:
+    """
+    Residue codes of Arrow string chunks, encoded as they are read. Slices
+    and index arrays return codes like a uint8 array would, reading only the
+    bytes they cover, so a memory-mapped column is never copied whole.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.starts = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in chunks], out=self.starts[1:])
+
+    def __len__(self):
+        return int(self.starts[-1])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise IndexError("MappedResidues only supports contiguous slices")
+            pieces = []
+            chunk = int(np.searchsorted(self.starts, start, side="right")) - 1
+            while start < stop:
+                lo = start - self.starts[chunk]
+                hi = min(stop - self.starts[chunk], len(self.chunks[chunk]))
+                pieces.append(self.chunks[chunk][lo:hi])
+                start = self.starts[chunk] + hi
+                chunk += 1
+            if not pieces:
+                return np.empty(0, dtype=np.uint8)
+            return ENCODE_TABLE[pieces[0] if len(pieces) == 1 else np.concatenate(pieces)]
+        positions = np.asarray(key, dtype=np.int64)
+        flat = positions.ravel()
+        owners = np.searchsorted(self.starts, flat, side="right") - 1
+        raw = np.empty(len(flat), dtype=np.uint8)
+        for chunk in np.unique(owners):
+            mask = owners == chunk
+            raw[mask] = self.chunks[chunk][flat[mask] - self.starts[chunk]]
+        return ENCODE_TABLE[raw].reshape(positions.shape)
+
+
+def encode_sequence(sequence):
+    """Encode a single sequence string into residue codes"""
+    return ENCODE_TABLE[np.frombuffer(str(sequence).encode("ascii", errors="replace"), dtype=np.uint8)]
+
+
+class EncodedSequences:
+    """Residue codes of many sequences packed into one contiguous uint8 buffer"""
+
+    def __init__(self, codes, offsets):
+        self.codes = codes
+        self.offsets = offsets
+
+    def __reduce__(self):
+        # Lets pickle and st.cache_data treat the buffer as plain arrays
+        return (EncodedSequences, (self.codes, self.offsets))
+
+    @classmethod
+    def from_sequences(cls, sequences):
+        """Encode an iterable of sequence strings"""
+        sequences = list(sequences)
+        lengths = np.fromiter((len(sequence) for sequence in sequences), dtype=np.int64, count=len(sequences))
+        offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        raw = np.frombuffer("".join(sequences).encode("ascii", errors="replace"), dtype=np.uint8)
+        return cls(ENCODE_TABLE[raw], offsets)
+
+    @classmethod
+    def from_arrow(cls, array):
+        """Encode an Arrow (large_)string array straight from its offset and data buffers"""
+        array = array.combine_chunks() if hasattr(array, "combine_chunks") else array
+        offsets, raw = _arrow_buffers(array)
+        return cls(ENCODE_TABLE[raw], offsets)
+
+    @classmethod
+    def map_arrow(cls, array):
+        """
+        Like from_arrow, but the residues stay in the Arrow buffers, memory-mapped
+        or not, and are encoded per block as they are read. Only the offsets
+        are held in memory; slice() returns blocks with their codes resident.
+        """
+        chunks = array.chunks if hasattr(array, "chunks") else [array]
+        offsets, raws, shift = [np.zeros(1, dtype=np.int64)], [], 0
+        for chunk in chunks:
+            chunk_offsets, raw = _arrow_buffers(chunk)
+            offsets.append(chunk_offsets[1:] + shift)
+            raws.append(raw)
+            shift += len(raw)
+        return cls(MappedResidues(raws), np.concatenate(offsets))
+
+    @classmethod
+    def concatenate(cls, parts):
+        """Join several encoded batches into one buffer"""
+        parts = list(parts)
+        if not parts:
+            return cls(np.empty(0, dtype=np.uint8), np.zeros(1, dtype=np.int64))
+        codes = np.concatenate([part.codes for part in parts])
+        offsets = [parts[0].offsets]
+        shift = parts[0].offsets[-1]
+        for part in parts[1:]:
+            offsets.append(part.offsets[1:] + shift)
+            shift += part.offsets[-1]
+        return cls(codes, np.concatenate(offsets))
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position):
+        return self.codes[self.offsets[position]:self.offsets[position + 1]]
+
+    def slice(self, start, stop):
+        """Return proteins [start, stop) as their own EncodedSequences"""
+        lo, hi = self.offsets[start], self.offsets[stop]
+        return EncodedSequences(self.codes[lo:hi], self.offsets[start:stop + 1] - lo)
+
+    def iter_blocks(self, block_residues=DEFAULT_BLOCK_RESIDUES):
+        """Yield (start, stop) protein ranges holding roughly block_residues residues each"""
+        total = len(self)
+        start = 0
+        while start < total:
+            limit = self.offsets[start] + block_residues
+            stop = int(np.searchsorted(self.offsets, limit, side="right")) - 1
+            stop = min(max(stop, start + 1), total)
+            yield start, stop
+            start = stop
+
+
+def composition_counts(encoded, block_residues=DEFAULT_BLOCK_RESIDUES):
+    """Count every residue code over the whole buffer"""
+    # bincount widens its input to intp, so count in blocks to bound that copy
+    counts = np.zeros(N_CODES, dtype=np.int64)
+    for start in range(0, len(encoded.codes), block_residues):
+        counts += np.bincount(encoded.codes[start:start + block_residues], minlength=N_CODES)
+    return counts
+
+
+def counts_to_dict(counts):
+    """Return {letter: count} for the residue codes that occur, as the composition plot expects"""
+    letters = ALPHABET + "?"
+    return {letters[code]: int(count) for code, count in enumerate(counts) if count}
+
+
+def composition_dict(encoded):
+    """Count residues over the whole buffer as a {letter: count} dict"""
+    return counts_to_dict(composition_counts(encoded))
+
+
+def composition_matrix(encoded, block_residues=DEFAULT_BLOCK_RESIDUES):
+    """Per-protein residue counts as an (n_proteins, N_CODES) matrix via blocked bincounts"""
+    matrix = np.zeros((len(encoded), N_CODES), dtype=np.int32)
+    for start, stop in encoded.iter_blocks(block_residues):
+        lo, hi = encoded.offsets[start], encoded.offsets[stop]
+        rows = np.repeat(np.arange(stop - start, dtype=np.int64), np.diff(encoded.offsets[start:stop + 1]))
+        flat = np.bincount(rows * N_CODES + encoded.codes[lo:hi], minlength=(stop - start) * N_CODES)
+        matrix[start:stop] = flat.reshape(stop - start, N_CODES)
+    return matrix
+
+
+def composition_table(encoded, ids=None):
+    """Per-protein percentage of each standard amino acid as a reusable feature table"""
+    counts = composition_matrix(encoded)[:, :len(AMINO_ACIDS)]
+    lengths = encoded.lengths.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.where(lengths[:, None] > 0, counts * 100.0 / lengths[:, None], 0.0)
+    index = pd.Index(ids, name="ID") if ids is not None else None
+    return pd.DataFrame(percent.astype(np.float32), columns=list(AMINO_ACIDS), index=index)
@@ -0,0 +1,159 @@
+import json
+import os
+
+import pandas as pd
+
+from proteomics.dataset import source_fingerprint
+
+INDEX_SUFFIX = ".fai"
+
+# Same five columns as a samtools faidx index
+INDEX_COLUMNS = ("name", "length", "offset", "linebases", "linewidth")
+
+
+def index_path_for(fasta_path):
+    """Return the index location that sits next to a FASTA file"""
+    return fasta_path + INDEX_SUFFIX
+
+
+def _scan_records(handle):
+    """Yield (name, length, offset, linebases, linewidth) for each record of a binary handle"""
+    position = 0
+    name = None
+    length = offset = linebases = linewidth = 0
+    uniform = True
+    last_short = False
+
+    def finish():
+        if uniform:
+            return (name, length, offset, linebases or length, linewidth or length)
+        # Ragged line widths: describe the record as one "line" spanning its bytes,
+        # so fetch() still reads exactly the right region
+        return (name, length, offset, length, position - offset)
+
+    for line in handle:
+        if line.startswith(b">"):
+            if name is not None:
+                yield finish()
+            header = line[1:].strip().decode("utf-8", errors="replace")
+            name = header.split(None, 1)[0] if header else ""
+            position += len(line)
+            length = linebases = linewidth = 0
+            offset = position
+            uniform = True
+            last_short = False
+            continue
+
+        bases = len(line.rstrip(b"\r\n"))
+        position += len(line)
+        if name is None:
+            continue
+        if not bases:
+            # A blank line is only harmless if no more sequence follows it
+            last_short = linebases > 0
+            continue
+        if linebases == 0:
+            linebases, linewidth = bases, len(line)
+        elif last_short or bases > linebases or len(line) - bases != linewidth - linebases:
+            uniform = False
+        last_short = bases < linebases
+        length += bases
+
+    if name is not None:
+        yield finish()
+
+
+def source_path_for(index_path):
+    """Return the sidecar JSON file recording which FASTA file an index was built from"""
+    return index_path + ".json"
+
+
+def build_fasta_index(fasta_path, index_path=None):
+    """Scan a FASTA file once and persist a byte-offset index next to it"""
+    index_path = index_path or index_path_for(fasta_path)
+    source = source_fingerprint(fasta_path)
+    with open(fasta_path, "rb") as handle:
+        index = pd.DataFrame(list(_scan_records(handle)), columns=list(INDEX_COLUMNS))
+
+    # The .fai keeps the samtools layout, so the source fingerprint goes in a sidecar
+    tmp_path = f"{index_path}.tmp-{os.getpid()}"
+    index.to_csv(tmp_path, sep="\t", header=False, index=False)
+    tmp_source_path = f"{source_path_for(index_path)}.tmp-{os.getpid()}"
+    with open(tmp_source_path, "w") as f:
+        json.dump({"source": source}, f)
+    os.replace(tmp_path, index_path)
+    os.replace(tmp_source_path, source_path_for(index_path))
+    return index
+
+
+def is_index_current(fasta_path, index_path=None):
+    """Check whether an index exists and was built from the current FASTA file, by size and mtime"""
+    index_path = index_path or index_path_for(fasta_path)
+    try:
+        with open(source_path_for(index_path), "r") as f:
+            source = json.load(f).get("source")
+    except (OSError, ValueError):
+        return False
+    return os.path.exists(index_path) and source == source_fingerprint(fasta_path)
+
+
+def first_positions(names):
+    """Map each name to the position of its first occurrence, like a row filter would pick"""
+    names = list(names)
+    # Later (reversed) assignments win, so the earliest position is kept
+    return dict(zip(reversed(names), range(len(names) - 1, -1, -1)))
+
+
+class FastaIndex:
+    """Random access to single records of a FASTA file through its byte-offset index"""
+
+    def __init__(self, fasta_path, index):
+        self.fasta_path = fasta_path
+        self.names = index["name"].to_numpy()
+        self.lengths = index["length"].to_numpy()
+        self.offsets = index["offset"].to_numpy()
+        self.linebases = index["linebases"].to_numpy()
+        self.linewidths = index["linewidth"].to_numpy()
+        self.positions = first_positions(self.names)
+
+    @classmethod
+    def open(cls, fasta_path, index_path=None):
+        """Load the index for a FASTA file, building and persisting it if missing or stale"""
+        index_path = index_path or index_path_for(fasta_path)
+        if is_index_current(fasta_path, index_path):
+            index = pd.read_csv(
+                index_path,
+                sep="\t",
+                header=None,
+                names=list(INDEX_COLUMNS),
+                dtype={"name": str},
+                keep_default_na=False,
+            )
+        else:
+            index = build_fasta_index(fasta_path, index_path)
+        return cls(fasta_path, index)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.positions
+
+    def fetch(self, name):
+        """Read just the sequence of one record from disk"""
+        return self.fetch_at(self.positions[name])
+
+    def fetch_at(self, position):
+        """Read just the sequence of the record at a position in file order"""
+        length = int(self.lengths[position])
+        if length == 0:
+            return ""
+        linebases = int(self.linebases[position])
+        linewidth = int(self.linewidths[position])
+        full_lines, remainder = divmod(length, linebases)
+        span = full_lines * linewidth + remainder
+
+        with open(self.fasta_path, "rb") as handle:
+            handle.seek(int(self.offsets[position]))
+            raw = handle.read(span)
+        return raw.decode("ascii", errors="replace").replace("\n", "").replace("\r", "").replace(" ", "")
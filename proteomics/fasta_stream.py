@@ -0,0 +1,114 @@
+import codecs
+import gzip
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Read size for each chunk pulled from the underlying file handle
+DEFAULT_CHUNK_SIZE = 1 << 20
+# Number of records emitted per columnar batch
+DEFAULT_BATCH_SIZE = 10_000
+
+BATCH_COLUMNS = ("ID", "Description", "Length", "Sequence")
+
+# Compressed input is accepted as gzip, and as zstd when zstandard is installed
+COMPRESSED_EXTENSIONS = [".gz"] + ([".zst"] if zstandard is not None else [])
+PLAIN_FASTA_EXTENSIONS = ["fasta", "fa", "faa"]
+# Final file extensions accepted for FASTA input, plain or compressed
+FASTA_EXTENSIONS = PLAIN_FASTA_EXTENSIONS + [suffix[1:] for suffix in COMPRESSED_EXTENSIONS]
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _new_batch():
+    return {column: [] for column in BATCH_COLUMNS}
+
+
+def _append_record(batch, block):
+    """Split a raw '>header\\nSEQ...' block and append its fields to the batch"""
+    header, _, body = block.partition("\n")
+    header = header.lstrip(">").strip()
+    sequence = body.replace("\n", "").replace("\r", "").replace(" ", "")
+    batch["ID"].append(header.split(None, 1)[0] if header else "")
+    batch["Description"].append(header)
+    batch["Length"].append(len(sequence))
+    batch["Sequence"].append(sequence)
+
+
+def _iter_text_chunks(handle, chunk_size):
+    """Yield decoded text chunks from either a text or a binary file handle"""
+    decoder = None
+    while True:
+        chunk = handle.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            chunk = decoder.decode(chunk)
+        yield chunk
+    if decoder is not None:
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def iter_fasta_batches(handle, batch_size=DEFAULT_BATCH_SIZE, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream a FASTA file handle and yield columnar batches of records.
+    Each batch is a dict of lists keyed by ID, Description, Length and Sequence,
+    so only one chunk of raw text and one batch of records is held at a time.
+    """
+    batch = _new_batch()
+    carry = ""
+    started = False
+
+    for chunk in _iter_text_chunks(handle, chunk_size):
+        buffer = carry + chunk
+
+        # Skip anything before the first record header
+        if not started:
+            start = buffer.find(">")
+            if start == -1:
+                carry = ""
+                continue
+            buffer = buffer[start:]
+            started = True
+
+        # Only records followed by another header are known to be complete
+        cut = buffer.rfind("\n>")
+        if cut == -1:
+            carry = buffer
+            continue
+        complete, carry = buffer[:cut], buffer[cut + 1:]
+
+        for block in complete.split("\n>"):
+            _append_record(batch, block)
+            if len(batch["ID"]) >= batch_size:
+                yield batch
+                batch = _new_batch()
+
+    if started and carry:
+        _append_record(batch, carry)
+    if batch["ID"]:
+        yield batch
+
+
+def open_decompressed(handle):
+    """
+    Wrap a seekable binary handle so gzip or zstd content is decompressed as
+    it is read. The format is sniffed from the magic bytes; anything else is
+    returned unchanged.
+    """
+    magic = handle.read(4)
+    handle.seek(0)
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=handle, mode="rb")
+    if magic.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("Reading .zst files requires the zstandard package (pip install zstandard)")
+        return zstandard.ZstdDecompressor().stream_reader(handle, read_across_frames=True, closefd=False)
+    return handle
@@ -0,0 +1,56 @@
+import re
+
+import pandas as pd
+
+HEADER_FIELDS = ("Protein Name", "OS", "OX", "GN", "PE", "SV")
+
+# Nullable integer dtypes for the numeric header fields
+HEADER_DTYPES = {"OX": "Int64", "PE": "Int8", "SV": "Int16"}
+
+# One anchored pattern for the whole header. Each free-text value consumes
+# characters up to the next ' KEY=' token for a later UniProt key, so '=' inside
+# protein or organism names and a missing GN are handled without backtracking.
+# CAFA headers additionally prefix the line with the bare accession. A key
+# token never starts the accession or the name, so headers without a protein
+# name still parse; the space before a key is then already consumed.
+_KEYS = "OS|OX|GN|PE|SV"
+_UNTIL = r"(?:[^ ]+| (?!(?:{keys})=))*"
+
+UNIPROT_HEADER_RE = re.compile(
+    r"^(?:(?!(?:sp|tr)\||(?:" + _KEYS + r")=)\S+(?: +|$))?"
+    r"(?:(?:sp|tr)\|[^| ]+\|\S+ *)?"
+    r"(?P<name>(?!(?:" + _KEYS + r")=)" + _UNTIL.format(keys=_KEYS) + r")?"
+    r"(?: ?OS=(?P<os>" + _UNTIL.format(keys="OX|GN|PE|SV") + r"))?"
+    r"(?: ?OX=(?P<ox>\d+))?"
+    r"(?: ?GN=(?P<gn>\S+))?"
+    r"(?: ?PE=(?P<pe>\d+))?"
+    r"(?: ?SV=(?P<sv>\d+))?"
+    r"(?: .*)?$"
+)
+
+_EMPTY_MATCH = (None,) * len(HEADER_FIELDS)
+
+
+def parse_uniprot_header(header):
+    """Parse one UniProt-style FASTA header into (name, OS, OX, GN, PE, SV) strings"""
+    match = UNIPROT_HEADER_RE.match(header)
+    if match is None:
+        return _EMPTY_MATCH
+    return tuple(value.strip() or None if value else None for value in match.groups())
+
+
+def parse_headers(descriptions):
+    """Parse FASTA descriptions in a single pass into a typed metadata DataFrame"""
+    match = UNIPROT_HEADER_RE.match
+    parsed = [m.groups() if m else _EMPTY_MATCH for m in map(match, descriptions)]
+    columns = list(zip(*parsed)) if parsed else [()] * len(HEADER_FIELDS)
+
+    df = {}
+    for field, values in zip(HEADER_FIELDS, columns):
+        if field in HEADER_DTYPES:
+            # Digits only, so the Arrow string-to-int cast cannot fail
+            df[field] = pd.array(values, dtype="string[pyarrow]").astype(HEADER_DTYPES[field])
+        else:
+            column = pd.Series(values, dtype=object)
+            df[field] = column.str.strip().replace("", None)
+    return pd.DataFrame(df)
@@ -0,0 +1,94 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from proteomics.encoding import EncodedSequences, composition_counts
+from proteomics.headers import parse_headers
+from proteomics.properties import compute_properties
+from proteomics.summary import DatasetSummary
+from proteomics.table import compact_table, concat_tables
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# Residues per shard when splitting an already encoded dataset across workers
+SHARD_RESIDUES = 1 << 23
+
+
+def imap_ordered(func, items, workers=None, max_pending=None, progress=None):
+    """
+    Map func over items in a process pool and yield results in input order.
+    At most max_pending items are in flight, so a streamed input is never
+    read far ahead of the workers. progress(result) is called per result.
+    With a single worker everything runs inline in this process.
+    """
+    workers = workers or DEFAULT_WORKERS
+    if workers <= 1:
+        for item in items:
+            result = func(item)
+            if progress is not None:
+                progress(result)
+            yield result
+        return
+
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= max_pending:
+                result = pending.popleft().result()
+                if progress is not None:
+                    progress(result)
+                yield result
+        while pending:
+            result = pending.popleft().result()
+            if progress is not None:
+                progress(result)
+            yield result
+
+
+def analyze_shard(batch):
+    """Parse headers, encode residues and compute properties for one streamed batch"""
+    frame = pd.DataFrame({
+        "ID": batch["ID"],
+        "Length": batch["Length"],
+        "Sequence": batch["Sequence"],
+    })
+    frame = compact_table(pd.concat([frame, parse_headers(batch["Description"])], axis=1))
+    encoded = EncodedSequences.from_sequences(batch["Sequence"])
+    properties = compute_properties(encoded)
+    return {
+        "frame": frame,
+        "encoded": encoded,
+        "properties": properties,
+        "summary": DatasetSummary.from_frame(frame, composition_counts(encoded), properties),
+    }
+
+
+def merge_shards(shards):
+    """Concatenate shard results in order into one frame, buffer and property table, and merge their summaries"""
+    shards = list(shards)
+    frame = concat_tables(shard["frame"] for shard in shards)
+    encoded = EncodedSequences.concatenate(shard["encoded"] for shard in shards)
+    properties = pd.concat([shard["properties"] for shard in shards], ignore_index=True)
+    properties.index = pd.Index(frame["ID"].to_numpy(), name="ID")
+    summary = DatasetSummary()
+    for shard in shards:
+        summary.merge(shard["summary"])
+    return frame, encoded, properties, summary
+
+
+def _properties_shard(encoded):
+    return compute_properties(encoded)
+
+
+def compute_properties_sharded(encoded, ids=None, workers=None, progress=None):
+    """Compute the property table of an encoded dataset with its proteins split across workers"""
+    shards = (encoded.slice(start, stop) for start, stop in encoded.iter_blocks(SHARD_RESIDUES))
+    parts = list(imap_ordered(_properties_shard, shards, workers=workers, progress=progress))
+    properties = pd.concat(parts, ignore_index=True) if parts else compute_properties(encoded)
+    if ids is not None:
+        properties.index = pd.Index(ids, name="ID")
+    return properties
@@ -0,0 +1,116 @@
+import numpy as np
+from Bio.SeqUtils import IsoelectricPoint as iep
+from Bio.SeqUtils import ProtParamData
+
+from proteomics.encoding import encode_sequence
+from proteomics.properties import KD_TABLE, residue_table
+
+# Upper bound on the points shipped to the browser for one profile
+MAX_PROFILE_POINTS = 2000
+
+# ProtParam's flexibility parameters are only defined for a 9-residue window
+FLEXIBILITY_WINDOW = 9
+
+# Unknown residues score 0
+FLEX_TABLE = residue_table(ProtParamData.Flex)
+
+
+def _flexibility_kernel():
+    """The exact window weights of ProteinAnalysis.flexibility(), including its offset middle residue"""
+    weights = [0.25, 0.4375, 0.625, 0.8125]
+    kernel = np.zeros(FLEXIBILITY_WINDOW)
+    for j, weight in enumerate(weights):
+        kernel[j] += weight
+        kernel[FLEXIBILITY_WINDOW - j - 1] += weight
+    kernel[FLEXIBILITY_WINDOW // 2 + 1] += 1.0
+    return kernel / 5.25
+
+
+FLEXIBILITY_KERNEL = _flexibility_kernel()
+
+
+def residue_charge_table(ph=7.0):
+    """Side-chain partial charge of each residue at the given pH"""
+    # The terminal pK entries are not residue letters, so residue_table skips them
+    charges = {aa: 1.0 / (10 ** (ph - pk) + 1.0) for aa, pk in iep.positive_pKs.items()}
+    charges.update({aa: -1.0 / (10 ** (pk - ph) + 1.0) for aa, pk in iep.negative_pKs.items()})
+    return residue_table(charges)
+
+
+def window_kernel(window, edge=1.0):
+    """Linear edge-weighted window, normalised like ProteinAnalysis.protein_scale()"""
+    half = window // 2
+    unit = 2 * (1.0 - edge) / (window - 1) if window > 1 else 0.0
+    tail = edge + unit * np.arange(half)
+    kernel = np.concatenate((tail, [1.0], tail[::-1])) if window % 2 else np.concatenate((tail, tail[::-1]))
+    return kernel / (tail.sum() * 2 + 1)
+
+
+def _windowed(codes, table, kernel):
+    """Slide a kernel over per-residue scale values; returns (window centre positions, scores)"""
+    values = table[codes]
+    if len(values) < len(kernel):
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    scores = np.correlate(values, kernel, mode="valid")
+    positions = np.arange(len(scores)) + len(kernel) // 2 + 1
+    return positions, scores
+
+
+def flexibility_profile(sequence):
+    """ProteinAnalysis.flexibility() as one correlation instead of a Python loop"""
+    positions, scores = _windowed(encode_sequence(sequence), FLEX_TABLE, FLEXIBILITY_KERNEL)
+    # ProtParam stops one window short of the sequence end
+    return positions[:-1], scores[:-1]
+
+
+def hydropathy_profile(sequence, window=9, edge=1.0):
+    """Kyte-Doolittle hydropathy averaged over a sliding window"""
+    return _windowed(encode_sequence(sequence), KD_TABLE, window_kernel(window, edge))
+
+
+def charge_profile(sequence, window=9, edge=1.0, ph=7.0):
+    """Side-chain charge at the given pH averaged over a sliding window"""
+    return _windowed(encode_sequence(sequence), residue_charge_table(ph), window_kernel(window, edge))
+
+
+def flexibility_scale_profile(sequence, window=9, edge=1.0):
+    """Flexibility averaged over an arbitrary window, for sizes other than ProtParam's 9"""
+    if window == FLEXIBILITY_WINDOW and edge == 1.0:
+        return flexibility_profile(sequence)
+    return _windowed(encode_sequence(sequence), FLEX_TABLE, window_kernel(window, edge))
+
+
+def downsample_lttb(x, y, max_points=MAX_PROFILE_POINTS):
+    """
+    Largest-Triangle-Three-Buckets downsampling: keeps the first and last point
+    and, per bucket, the point spanning the largest triangle with its neighbours,
+    so peaks and troughs survive while the point count stays bounded.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return x, y
+
+    bucket_size = (n - 2) / (max_points - 2)
+    edges = (np.arange(max_points - 1) * bucket_size).astype(np.int64) + 1
+    edges[-1] = n - 1
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    anchor = 0
+    for i in range(max_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[anchor] - next_x) * (y[start:stop] - y[anchor])
+            - (x[anchor] - x[start:stop]) * (next_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return x[selected], y[selected]
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+from Bio.Data.IUPACData import protein_weights
+from Bio.SeqUtils import IsoelectricPoint as iep
+from Bio.SeqUtils import ProtParamData
+
+from proteomics.encoding import (
+    ALPHABET,
+    AMINO_ACIDS,
+    DEFAULT_BLOCK_RESIDUES,
+    N_CODES,
+    composition_matrix,
+)
+
+# Average mass of water lost per peptide bond, as in Bio.SeqUtils.molecular_weight
+WATER_WEIGHT = 18.0153
+
+PROPERTY_COLUMNS = (
+    "Molecular Weight",
+    "Theoretical pI",
+    "Instability Index",
+    "GRAVY",
+    "Aromaticity",
+    "Charge at pH 7",
+)
+
+_CODE = {letter: code for code, letter in enumerate(ALPHABET)}
+_STANDARD = np.zeros(N_CODES, dtype=bool)
+_STANDARD[:len(AMINO_ACIDS)] = True
+
+
+def residue_table(values, default=0.0):
+    """Lay a {letter: value} scale out as a lookup array over residue codes"""
+    table = np.full(N_CODES, default, dtype=np.float64)
+    for letter, value in values.items():
+        if letter in _CODE:
+            table[_CODE[letter]] = value
+    return table
+
+
+WEIGHT_TABLE = residue_table(protein_weights)
+HAS_WEIGHT = residue_table({letter: 1.0 for letter in protein_weights}).astype(bool)
+KD_TABLE = residue_table(ProtParamData.kd)
+
+DIWV_TABLE = np.zeros((N_CODES, N_CODES), dtype=np.float64)
+for _first, _row in ProtParamData.DIWV.items():
+    for _second, _value in _row.items():
+        DIWV_TABLE[_CODE[_first], _CODE[_second]] = _value
+
+# Terminal pK values depend on the first and last residue of each protein
+NTERM_PK_TABLE = residue_table(iep.pKnterminal, default=iep.positive_pKs["Nterm"])
+CTERM_PK_TABLE = residue_table(iep.pKcterminal, default=iep.negative_pKs["Cterm"])
+POSITIVE_SIDE_CHAINS = [(_CODE[aa], pk) for aa, pk in iep.positive_pKs.items() if aa in _CODE]
+NEGATIVE_SIDE_CHAINS = [(_CODE[aa], pk) for aa, pk in iep.negative_pKs.items() if aa in _CODE]
+
+
+def charge_at_ph(counts, nterm_pk, cterm_pk, ph):
+    """Net charge of every protein at the given pH (scalar or one value per protein)"""
+    positive = 1.0 / (10 ** (ph - nterm_pk) + 1.0)
+    for code, pk in POSITIVE_SIDE_CHAINS:
+        positive = positive + counts[:, code] / (10 ** (ph - pk) + 1.0)
+    negative = 1.0 / (10 ** (cterm_pk - ph) + 1.0)
+    for code, pk in NEGATIVE_SIDE_CHAINS:
+        negative = negative + counts[:, code] / (10 ** (pk - ph) + 1.0)
+    return positive - negative
+
+
+def isoelectric_points(counts, nterm_pk, cterm_pk, tolerance=0.0001):
+    """Bisect the pI of all proteins at once, stepping exactly like Bio.SeqUtils.IsoelectricPoint"""
+    n = len(counts)
+    ph = np.full(n, 7.775)
+    low = np.full(n, 4.05)
+    high = np.full(n, 12.0)
+    active = np.ones(n, dtype=bool)
+    while active.any():
+        charge = charge_at_ph(counts[active], nterm_pk[active], cterm_pk[active], ph[active])
+        positive = charge > 0.0
+        low[active] = np.where(positive, ph[active], low[active])
+        high[active] = np.where(positive, high[active], ph[active])
+        ph[active] = (low[active] + high[active]) / 2
+        active &= (high - low) > tolerance
+    return ph
+
+
+def _dipeptide_sums(encoded, block_residues):
+    """Sum the DIWV instability weights of every adjacent residue pair per protein"""
+    sums = np.zeros(len(encoded), dtype=np.float64)
+    for start, stop in encoded.iter_blocks(block_residues):
+        lo, hi = encoded.offsets[start], encoded.offsets[stop]
+        codes = encoded.codes[lo:hi]
+        values = DIWV_TABLE[codes[:-1], codes[1:]]
+        cumulative = np.concatenate(([0.0], np.cumsum(values)))
+        # Pairs of protein i sit at positions [begin, end) of this block;
+        # clipping keeps empty proteins (whose sum is unused) in bounds
+        begin = np.minimum(encoded.offsets[start:stop] - lo, len(values))
+        end = np.maximum(encoded.offsets[start + 1:stop + 1] - lo - 1, begin)
+        sums[start:stop] = cumulative[end] - cumulative[begin]
+    return sums
+
+
+def compute_properties(encoded, ids=None, block_residues=DEFAULT_BLOCK_RESIDUES):
+    """
+    Compute molecular weight, pI, instability index, GRAVY, aromaticity and
+    charge at pH 7 for every encoded protein from residue lookup tables.
+    Values match Bio.SeqUtils.ProtParam; where ProtParam would raise on a
+    residue it has no parameters for, the value is NaN.
+    """
+    counts = composition_matrix(encoded, block_residues).astype(np.float64)
+    lengths = encoded.lengths.astype(np.float64)
+    empty = lengths == 0
+    nonstandard = counts[:, ~_STANDARD].sum(axis=1) > 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        molecular_weight = counts @ WEIGHT_TABLE - (lengths - 1) * WATER_WEIGHT
+        molecular_weight[(counts[:, ~HAS_WEIGHT].sum(axis=1) > 0) | empty] = np.nan
+
+        gravy = counts @ KD_TABLE / lengths
+        aromaticity = counts[:, [_CODE["F"], _CODE["W"], _CODE["Y"]]].sum(axis=1) / lengths
+        instability = 10.0 / lengths * _dipeptide_sums(encoded, block_residues)
+        gravy[nonstandard | empty] = np.nan
+        aromaticity[empty] = np.nan
+        instability[nonstandard | empty] = np.nan
+
+    # Empty proteins borrow a neighbour's terminal residue; their values are dropped below
+    if len(encoded.codes):
+        last_position = len(encoded.codes) - 1
+        first = encoded.codes[np.minimum(encoded.offsets[:-1], last_position)]
+        last = encoded.codes[np.clip(encoded.offsets[1:] - 1, 0, last_position)]
+    else:
+        first = last = np.zeros(len(encoded), dtype=np.uint8)
+    nterm_pk = NTERM_PK_TABLE[first]
+    cterm_pk = CTERM_PK_TABLE[last]
+
+    pi = isoelectric_points(counts, nterm_pk, cterm_pk)
+    charge = charge_at_ph(counts, nterm_pk, cterm_pk, 7.0)
+    pi[empty] = np.nan
+    charge[empty] = np.nan
+
+    index = pd.Index(ids, name="ID") if ids is not None else None
+    return pd.DataFrame({
+        "Molecular Weight": molecular_weight,
+        "Theoretical pI": pi,
+        "Instability Index": instability,
+        "GRAVY": gravy,
+        "Aromaticity": aromaticity,
+        "Charge at pH 7": charge,
+    }, index=index)
@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+
+from proteomics.encoding import composition_table, counts_to_dict
+from proteomics.fasta_stream import DEFAULT_BATCH_SIZE, iter_fasta_batches, open_decompressed
+from proteomics.parallel import DEFAULT_WORKERS, analyze_shard, imap_ordered, merge_shards
+from proteomics.result_cache import hash_file
+from proteomics.streaming import fasta_paths
+from proteomics.summary import DatasetSummary
+from proteomics.table import compact_table
+
+DEFAULT_REPORT_DIR = os.environ.get("PROTEOMICS_REPORT_DIR", "reports")
+
+REPORT_FILE = "report.json"
+PROTEINS_FILE = "proteins.parquet"
+PROPERTIES_FILE = "properties.parquet"
+COMPOSITION_FILE = "composition.parquet"
+
+# Bumped whenever the report layout or the analysis changes so stale reports are ignored
+REPORT_VERSION = 2
+
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+
+
+def report_dir_for(fasta_path, output_dir=DEFAULT_REPORT_DIR):
+    """Return the report directory of a FASTA file: its name without extensions under output_dir"""
+    name = os.path.basename(fasta_path)
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return os.path.join(output_dir, os.path.splitext(name)[0])
+
+
+def analyze_fasta_path(fasta_path, workers=1, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Run the dashboard pipeline on a FASTA file: return (frame, encoded, properties, summary)"""
+    with open(fasta_path, "rb") as raw, open_decompressed(raw) as handle:
+        batches = iter_fasta_batches(handle, batch_size=batch_size)
+        shards = list(imap_ordered(analyze_shard, batches, workers=workers, progress=progress))
+    if not shards:
+        raise ValueError(f"No FASTA records found in {fasta_path}")
+    return merge_shards(shards)
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_report(fasta_path, output_dir=DEFAULT_REPORT_DIR, workers=1):
+    """
+    Analyze a FASTA file and write its report directory: the protein table,
+    the property table and the per-protein composition (%) as Parquet, and
+    report.json with the General-tab statistics, the residue counts and the
+    mergeable summary. report.json is written last and names the SHA-256 of
+    the source, so a report is only picked up once it is complete and only
+    for the exact file it was computed from.
+    """
+    report_dir = report_dir_for(fasta_path, output_dir)
+    os.makedirs(report_dir, exist_ok=True)
+    frame, encoded, properties, summary = analyze_fasta_path(fasta_path, workers=workers)
+    composition = composition_table(encoded, ids=frame["ID"].to_numpy())
+
+    # An earlier report stops being served before its tables are replaced
+    try:
+        os.remove(os.path.join(report_dir, REPORT_FILE))
+    except FileNotFoundError:
+        pass
+    _write_atomic(os.path.join(report_dir, PROTEINS_FILE), lambda path: frame.to_parquet(path, index=False))
+    _write_atomic(os.path.join(report_dir, PROPERTIES_FILE), properties.to_parquet)
+    _write_atomic(os.path.join(report_dir, COMPOSITION_FILE), composition.to_parquet)
+
+    report = {
+        "version": REPORT_VERSION,
+        "source": {
+            "name": os.path.basename(fasta_path),
+            "size": os.path.getsize(fasta_path),
+            "sha256": hash_file(fasta_path),
+        },
+        "stats": summary.stats(),
+        "aa_counts": counts_to_dict(summary.aa_counts),
+        "summary": summary.to_dict(),
+    }
+
+    def dump(path):
+        with open(path, "w") as f:
+            json.dump(report, f)
+
+    _write_atomic(os.path.join(report_dir, REPORT_FILE), dump)
+    return report_dir
+
+
+def read_report_metadata(report_dir):
+    """Read report.json of a report directory, or None if it is missing, unreadable or from another version"""
+    try:
+        with open(os.path.join(report_dir, REPORT_FILE), "r") as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(report, dict) or report.get("version") != REPORT_VERSION:
+        return None
+    return report
+
+
+def find_report(digest, output_dir=DEFAULT_REPORT_DIR):
+    """Return the directory of a complete report computed from content with this SHA-256, or None"""
+    if not os.path.isdir(output_dir):
+        return None
+    with os.scandir(output_dir) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue
+            report = read_report_metadata(entry.path)
+            if report is not None and report.get("source", {}).get("sha256") == digest:
+                return entry.path
+    return None
+
+
+def load_report_properties(report_dir):
+    """Return only the property table of a report directory"""
+    return pd.read_parquet(os.path.join(report_dir, PROPERTIES_FILE))
+
+
+def load_report(report_dir):
+    """Return (frame, properties, composition, summary) from a report directory"""
+    report = read_report_metadata(report_dir)
+    if report is None:
+        raise ValueError(f"No readable report in {report_dir}")
+    frame = compact_table(pd.read_parquet(os.path.join(report_dir, PROTEINS_FILE)))
+    properties = load_report_properties(report_dir)
+    composition = pd.read_parquet(os.path.join(report_dir, COMPOSITION_FILE))
+    return frame, properties, composition, DatasetSummary.from_dict(report["summary"])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze FASTA files without the dashboard and write Parquet/JSON reports it can serve"
+    )
+    parser.add_argument("paths", nargs="+", help="FASTA files (plain or compressed) or directories of them")
+    parser.add_argument("-o", "--output", default=DEFAULT_REPORT_DIR, help="Directory to write one report directory per file into")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS, help="Worker processes per file")
+    args = parser.parse_args()
+
+    try:
+        fasta_files = [fasta_path for path in args.paths for fasta_path in fasta_paths(path)]
+    except ValueError as e:
+        parser.error(str(e))
+    report_dirs = [report_dir_for(fasta_path, args.output) for fasta_path in fasta_files]
+    if len(set(report_dirs)) != len(report_dirs):
+        parser.error("Input files must have distinct names, since each is written to a directory named after it")
+
+    for fasta_path in fasta_files:
+        start = time.perf_counter()
+        report_dir = write_report(fasta_path, args.output, workers=args.workers)
+        print(f"Wrote {report_dir} ({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+import pyarrow as pa
+from filelock import FileLock, Timeout
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "PROTEOMICS_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "proteomics"),
+)
+DEFAULT_MAX_BYTES = 2 << 30
+
+ENTRY_SUFFIX = ".entry"
+LOCK_SUFFIX = ".lock"
+EVICT_LOCK_NAME = ".evict.lock"
+
+# Part of every key, bumped whenever the cached layout or the analysis changes
+CACHE_VERSION = 3
+
+HASH_CHUNK_SIZE = 1 << 20
+
+# Temporary files older than this were left behind by a crashed writer
+STALE_TMP_SECONDS = 3600
+
+
+def hash_bytes(data):
+    """Return the SHA-256 hex digest of bytes held in memory"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of the content of the file at a path, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(digest, kind):
+    """Combine a content digest with the kind of result and the cache version"""
+    return f"{kind}-v{CACHE_VERSION}-{digest}"
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of immutable byte entries in a directory.
+    Entries are written to a temporary file and renamed into place, so
+    readers in other processes never see a partial entry. Reads bump the
+    entry's mtime, which is the recency eviction works from. Eviction and
+    per-key computation are serialized across processes with file locks.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = FileLock(os.path.join(cache_dir, EVICT_LOCK_NAME))
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+    def lock_for(self, key):
+        """Return the inter-process lock guarding the computation of one key"""
+        return FileLock(os.path.join(self.cache_dir, key + LOCK_SUFFIX))
+
+    def get(self, key):
+        """Return the bytes stored under key and mark them recently used, or None"""
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return payload
+
+    def put(self, key, payload):
+        """Atomically store payload under key, then evict down to the size bound"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=key, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path_for(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def discard(self, key):
+        """Remove one entry if it exists"""
+        try:
+            os.remove(self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits in max_bytes,
+        then the lock files of keys that no longer have an entry.
+        """
+        with self._lock:
+            entries = []
+            locks = []
+            now = time.time()
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if entry.name.endswith(ENTRY_SUFFIX):
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    elif entry.name.endswith(".tmp") and now - stat.st_mtime > STALE_TMP_SECONDS:
+                        _remove_quietly(entry.path)
+                    elif entry.name.endswith(LOCK_SUFFIX) and entry.name != EVICT_LOCK_NAME:
+                        locks.append(entry.path)
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if _remove_quietly(path):
+                    total -= size
+
+            for lock_path in locks:
+                if not os.path.exists(lock_path[:-len(LOCK_SUFFIX)] + ENTRY_SUFFIX):
+                    _remove_idle_lock(lock_path)
+
+    def get_or_compute(self, key, compute, dumps, loads):
+        """
+        Return loads(entry) on a hit. On a miss, compute the value while
+        holding the key's lock, so concurrent processes compute it once,
+        store dumps(value) and return the value. Unreadable entries are
+        discarded and recomputed.
+        """
+        value = self._load(key, loads)
+        if value is not None:
+            return value
+        with self.lock_for(key):
+            value = self._load(key, loads)
+            if value is not None:
+                return value
+            value = compute()
+            self.put(key, dumps(value))
+            return value
+
+    def _load(self, key, loads):
+        payload = self.get(key)
+        if payload is None:
+            return None
+        try:
+            return loads(payload)
+        except Exception:
+            self.discard(key)
+            return None
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        # Already gone, or still open by a reader on platforms that forbid it
+        return False
+    return True
+
+
+def _remove_idle_lock(path):
+    # A held lock means the key is being computed; its entry is on the way
+    try:
+        with FileLock(path, timeout=0):
+            _remove_quietly(path)
+    except Timeout:
+        pass
+
+
+def _table_bytes(table):
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _read_table(payload):
+    return pa.ipc.open_file(pa.BufferReader(payload)).read_all()
+
+
+def pack_analysis(df, properties, figures):
+    """
+    Serialize an analysis result into one zip container: the table and
+    property frame as zstd-compressed Arrow IPC, next to the figures, which
+    are already Plotly JSON strings.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr("table.arrow", _table_bytes(pa.Table.from_pandas(df, preserve_index=False)))
+        archive.writestr("properties.arrow", _table_bytes(pa.Table.from_pandas(properties)))
+        archive.writestr("figures.json", json.dumps(figures))
+    return buffer.getvalue()
+
+
+def unpack_analysis(payload, types_mapper=None):
+    """Inverse of pack_analysis: return (df, properties, figures)"""
+    with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+        df = _read_table(archive.read("table.arrow")).to_pandas(types_mapper=types_mapper)
+        properties = _read_table(archive.read("properties.arrow")).to_pandas()
+        figures = json.loads(archive.read("figures.json"))
+    return df, properties, figures
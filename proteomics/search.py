@@ -0,0 +1,79 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+DEFAULT_PAGE_SIZE = 50
+
+# Searched fields: (DataFrame column, index key)
+SEARCH_FIELDS = (
+    ("ID", "id"),
+    ("GN", "gene"),
+    ("Protein Name", "name"),
+    ("OS", "organism"),
+)
+
+# Match tiers, best first: (index key, match kind). A protein ranks at its
+# best matching tier; ties keep file order
+SEARCH_TIERS = (
+    ("id", "exact"),
+    ("id", "prefix"),
+    ("gene", "exact"),
+    ("gene", "prefix"),
+    ("name", "prefix"),
+    ("organism", "prefix"),
+    ("id", "substring"),
+    ("gene", "substring"),
+    ("name", "substring"),
+    ("organism", "substring"),
+)
+NO_MATCH = len(SEARCH_TIERS)
+
+_MATCHERS = {
+    "exact": lambda column, pattern: pc.equal(column, pattern),
+    "prefix": lambda column, pattern: pc.starts_with(column, pattern),
+    "substring": lambda column, pattern: pc.match_substring(column, pattern),
+}
+
+
+class ProteinSearchIndex:
+    """
+    Case-insensitive prefix and substring search over protein ID, gene name,
+    protein name and organism. The fields are lowercased once into Arrow
+    arrays, so each query is a handful of vectorized kernel passes and
+    returns row positions rather than the rows themselves.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.size = len(fields["id"])
+
+    @classmethod
+    def from_dataframe(cls, df):
+        fields = {}
+        for column, key in SEARCH_FIELDS:
+            values = pa.array(df[column], type=pa.string(), from_pandas=True)
+            fields[key] = pc.fill_null(pc.utf8_lower(values), "")
+        return cls(fields)
+
+    def rank(self, query):
+        """Return the best matching tier of every row, NO_MATCH where nothing matched"""
+        pattern = query.strip().lower()
+        if not pattern:
+            return np.zeros(self.size, dtype=np.int8)
+        ranks = np.full(self.size, NO_MATCH, dtype=np.int8)
+        # Worst tier first, so better tiers overwrite it
+        for tier, (key, kind) in reversed(list(enumerate(SEARCH_TIERS))):
+            mask = _MATCHERS[kind](self.fields[key], pattern)
+            ranks[mask.to_numpy(zero_copy_only=False)] = tier
+        return ranks
+
+    def search(self, query, page=0, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Return (row positions of one page of matches, total number of matches).
+        An empty query matches every protein in file order.
+        """
+        ranks = self.rank(query)
+        matches = np.flatnonzero(ranks < NO_MATCH)
+        matches = matches[np.argsort(ranks[matches], kind="stable")]
+        start = page * page_size
+        return matches[start:start + page_size], len(matches)
@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from proteomics.dataset import source_fingerprint
+from proteomics.fasta_stream import DEFAULT_BATCH_SIZE, iter_fasta_batches
+from proteomics.headers import HEADER_FIELDS, parse_headers
+from proteomics.parallel import DEFAULT_WORKERS, imap_ordered
+
+# Arrow IPC files (uncompressed) can be memory-mapped and read without copying,
+# which Parquet cannot, so the store is written in the IPC file format
+STORE_SUFFIX = ".arrow"
+
+STORE_SCHEMA = pa.schema(
+    [
+        ("ID", pa.string()),
+        ("Length", pa.int64()),
+        ("Sequence", pa.large_string()),
+    ]
+    + [
+        ("Protein Name", pa.string()),
+        ("OS", pa.string()),
+        ("OX", pa.int64()),
+        ("GN", pa.string()),
+        ("PE", pa.int8()),
+        ("SV", pa.int16()),
+    ]
+)
+
+# Bumped whenever the store layout changes so stale stores get rebuilt
+STORE_VERSION = 3
+
+
+def store_path_for(fasta_path):
+    """Return the default store location that sits next to a FASTA file"""
+    root, _ = os.path.splitext(fasta_path)
+    return root + STORE_SUFFIX
+
+
+def _batch_to_record_batch(batch):
+    fields = parse_headers(batch["Description"])
+    arrays = [
+        pa.array(batch["ID"], type=pa.string()),
+        pa.array(batch["Length"], type=pa.int64()),
+        pa.array(batch["Sequence"], type=pa.large_string()),
+    ]
+    for field in HEADER_FIELDS:
+        arrays.append(pa.array(fields[field], type=STORE_SCHEMA.field(field).type, from_pandas=True))
+    return pa.RecordBatch.from_arrays(arrays, schema=STORE_SCHEMA)
+
+
+def metadata_path_for(store_path):
+    """Return the sidecar JSON file that describes a store"""
+    return store_path + ".json"
+
+
+def read_store_metadata(store_path):
+    """Read the sidecar metadata of a store, or None if it is missing"""
+    try:
+        with open(metadata_path_for(store_path), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_store_current(fasta_path, store_path=None):
+    """Check whether a store exists and was built from the current FASTA file"""
+    store_path = store_path or store_path_for(fasta_path)
+    metadata = read_store_metadata(store_path)
+    if metadata is None or not os.path.exists(store_path):
+        return False
+    return (
+        metadata.get("version") == STORE_VERSION
+        and metadata.get("source") == source_fingerprint(fasta_path)
+    )
+
+
+def convert_fasta_to_store(fasta_path, store_path=None, batch_size=DEFAULT_BATCH_SIZE, workers=1):
+    """Convert a FASTA file into a memory-mappable Arrow sequence store"""
+    store_path = store_path or store_path_for(fasta_path)
+    tmp_path = f"{store_path}.tmp-{os.getpid()}"
+    source = source_fingerprint(fasta_path)
+    total = 0
+
+    with open(fasta_path, "rb") as handle, pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, STORE_SCHEMA) as writer:
+            # Header parsing runs per batch, across workers when asked; order is kept
+            batches = iter_fasta_batches(handle, batch_size=batch_size)
+            for record_batch in imap_ordered(_batch_to_record_batch, batches, workers=workers):
+                total += record_batch.num_rows
+                writer.write_batch(record_batch)
+
+    metadata = {
+        "version": STORE_VERSION,
+        "source": source,
+        "total_sequences": total,
+    }
+    tmp_metadata_path = f"{metadata_path_for(store_path)}.tmp-{os.getpid()}"
+    with open(tmp_metadata_path, "w") as f:
+        json.dump(metadata, f)
+    os.replace(tmp_path, store_path)
+    os.replace(tmp_metadata_path, metadata_path_for(store_path))
+    return store_path
+
+
+def ensure_sequence_store(fasta_path, store_path=None, workers=1):
+    """Build the store for a FASTA file unless an up-to-date one already exists"""
+    store_path = store_path or store_path_for(fasta_path)
+    if not is_store_current(fasta_path, store_path):
+        convert_fasta_to_store(fasta_path, store_path, workers=workers)
+    return store_path
+
+
+def open_sequence_store(store_path):
+    """Memory-map a store and return its Arrow table without copying"""
+    source = pa.memory_map(store_path, "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_store_dataframe(store_path, columns=None):
+    """Return the store as a DataFrame whose columns are views over the mapped file"""
+    table = open_sequence_store(store_path)
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a FASTA file into an Arrow sequence store")
+    parser.add_argument("fasta_path", help="Path to the input .fasta file")
+    parser.add_argument("-o", "--output", help="Path of the .arrow store to write")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS, help="Worker processes for header parsing")
+    args = parser.parse_args()
+
+    store_path = convert_fasta_to_store(args.fasta_path, args.output, workers=args.workers)
+    print(f"Wrote {store_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import io
+import os
+
+import numpy as np
+
+from proteomics.dataset import source_fingerprint
+from proteomics.encoding import DEFAULT_BLOCK_RESIDUES, N_CODES
+
+KMER_SIZE = 4
+# One-permutation MinHash: the 32-bit k-mer hash picks one of SKETCH_BINS
+# bins with its top bits and competes for that bin's minimum with the rest.
+# Only the low 16 bits of each minimum are kept (b-bit MinHash), which halves
+# the sketch size for a ~1/65536 chance of a spurious bin match
+SKETCH_BINS = 128
+_BIN_BITS = SKETCH_BINS.bit_length() - 1
+_VALUE_MASK = (1 << (32 - _BIN_BITS)) - 1
+EMPTY_BIN = np.uint16(0xFFFF)
+
+# Proteins ranked by sketch similarity that are re-scored exactly
+RERANK_CANDIDATES = 200
+DEFAULT_TOP_N = 10
+
+SKETCH_SUFFIX = ".sketch.npz"
+# Bumped whenever the sketch parameters change so stale sketches get rebuilt
+SKETCH_VERSION = 1
+
+# A fixed random hash for every possible k-mer, so sketches are reproducible
+KMER_HASHES = np.random.default_rng(20241017).integers(
+    0, 1 << 32, size=N_CODES ** KMER_SIZE, dtype=np.uint32
+)
+
+
+def kmer_ids(codes, k=KMER_SIZE):
+    """Return the integer id of every k-mer window of a residue code array"""
+    windows = len(codes) - k + 1
+    if windows <= 0:
+        return np.empty(0, dtype=np.int32)
+    ids = np.zeros(windows, dtype=np.int32)
+    for j in range(k):
+        ids *= N_CODES
+        ids += codes[j:j + windows]
+    return ids
+
+
+def iter_block_kmers(encoded, k=KMER_SIZE, block_residues=DEFAULT_BLOCK_RESIDUES):
+    """Yield (k-mer ids, owning protein positions) of every protein's k-mer windows, one block of proteins at a time"""
+    for start, stop in encoded.iter_blocks(block_residues):
+        block = encoded.slice(start, stop)
+        ids = kmer_ids(block.codes, k)
+        if not len(ids):
+            continue
+        # Keep only windows that end inside the protein they start in
+        owner = np.repeat(np.arange(start, stop), block.lengths)[:len(ids)]
+        ends = block.offsets[1:][owner - start]
+        valid = np.arange(k, len(ids) + k) <= ends
+        yield ids[valid], owner[valid]
+
+
+def build_sketches(encoded, block_residues=DEFAULT_BLOCK_RESIDUES):
+    """Compute the (proteins, SKETCH_BINS) uint16 MinHash sketch matrix of an encoded dataset"""
+    minima = np.full((len(encoded), SKETCH_BINS), 0xFFFFFFFF, dtype=np.uint32)
+    flat = minima.reshape(-1)
+    for ids, owner in iter_block_kmers(encoded, block_residues=block_residues):
+        hashes = KMER_HASHES[ids]
+        bins = owner * SKETCH_BINS + (hashes >> (32 - _BIN_BITS))
+        np.minimum.at(flat, bins, hashes & _VALUE_MASK)
+
+    empty = minima == 0xFFFFFFFF
+    # Real minima never collide with the empty marker
+    sketches = np.minimum(minima & 0xFFFF, int(EMPTY_BIN) - 1).astype(np.uint16)
+    sketches[empty] = EMPTY_BIN
+    return sketches
+
+
+def kmer_jaccard(query_kmers, codes):
+    """Exact Jaccard similarity between a sorted unique k-mer set and a sequence's k-mers"""
+    kmers = np.unique(kmer_ids(codes))
+    if not len(query_kmers) and not len(kmers):
+        return 0.0
+    shared = len(np.intersect1d(query_kmers, kmers, assume_unique=True))
+    return shared / (len(query_kmers) + len(kmers) - shared)
+
+
+class SimilarityIndex:
+    """
+    MinHash sketches of every protein's k-mer set. A query compares one
+    sketch against all of them in a single vectorized pass, then re-scores
+    the best candidates by their exact k-mer Jaccard similarity.
+    """
+
+    def __init__(self, sketches):
+        self.sketches = sketches
+
+    @classmethod
+    def build(cls, encoded):
+        return cls(build_sketches(encoded))
+
+    def __len__(self):
+        return len(self.sketches)
+
+    def estimate(self, position):
+        """Estimated k-mer Jaccard similarity of one protein to every protein"""
+        query = self.sketches[position]
+        query_empty = query == EMPTY_BIN
+        matches = ((self.sketches == query) & ~query_empty).sum(axis=1)
+        both_empty = ((self.sketches == EMPTY_BIN) & query_empty).sum(axis=1)
+        return matches / np.maximum(SKETCH_BINS - both_empty, 1)
+
+    def query(self, encoded, position, top_n=DEFAULT_TOP_N, candidates=RERANK_CANDIDATES):
+        """Return (positions, exact k-mer Jaccard scores) of the top_n proteins most similar to one"""
+        estimates = self.estimate(position)
+        estimates[position] = -1.0
+        candidates = min(candidates, len(estimates) - 1)
+        if candidates <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        shortlist = np.argpartition(-estimates, candidates - 1)[:candidates]
+        shortlist = shortlist[estimates[shortlist] > 0]
+
+        query_kmers = np.unique(kmer_ids(encoded[position]))
+        scores = np.array([kmer_jaccard(query_kmers, encoded[other]) for other in shortlist])
+        order = np.lexsort((shortlist, -scores))[:top_n]
+        return shortlist[order], scores[order]
+
+    def to_bytes(self, source=None):
+        """Serialize the sketches, with an optional source fingerprint, as an .npz payload"""
+        buffer = io.BytesIO()
+        source = source or {}
+        np.savez(
+            buffer,
+            sketches=self.sketches,
+            version=SKETCH_VERSION,
+            source_size=source.get("size", -1),
+            source_mtime_ns=source.get("mtime_ns", -1),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload, source=None):
+        """Load sketches from an .npz payload; None if stale or built with other parameters"""
+        with np.load(io.BytesIO(payload)) as data:
+            if int(data["version"]) != SKETCH_VERSION:
+                return None
+            if source is not None and (
+                int(data["source_size"]) != source["size"]
+                or int(data["source_mtime_ns"]) != source["mtime_ns"]
+            ):
+                return None
+            return cls(data["sketches"])
+
+
+def sketch_path_for(fasta_path):
+    """Return the sketch file location that sits next to a FASTA file"""
+    root, _ = os.path.splitext(fasta_path)
+    return root + SKETCH_SUFFIX
+
+
+def open_similarity_index(fasta_path, encoded, sketch_path=None):
+    """Load the persisted similarity index of a FASTA file, building and saving it if missing or stale"""
+    sketch_path = sketch_path or sketch_path_for(fasta_path)
+    source = source_fingerprint(fasta_path)
+    try:
+        with open(sketch_path, "rb") as f:
+            index = SimilarityIndex.from_bytes(f.read(), source)
+    except (OSError, ValueError, KeyError):
+        index = None
+    if index is None or len(index) != len(encoded):
+        index = SimilarityIndex.build(encoded)
+        tmp_path = f"{sketch_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(index.to_bytes(source))
+        os.replace(tmp_path, sketch_path)
+    return index
@@ -0,0 +1,91 @@
+import os
+
+from proteomics.fasta_stream import (
+    COMPRESSED_EXTENSIONS,
+    DEFAULT_BATCH_SIZE,
+    PLAIN_FASTA_EXTENSIONS,
+    iter_fasta_batches,
+    open_decompressed,
+)
+from proteomics.parallel import imap_ordered
+from proteomics.summary import DatasetSummary
+
+
+# Directory the dashboard may stream server-side FASTA files and shard directories from
+DATA_ROOT = os.environ.get("PROTEOMICS_DATA_ROOT", "data")
+
+
+def is_fasta_file(path):
+    """Whether path is a regular file with a FASTA extension, optionally followed by a compression suffix"""
+    root, extension = os.path.splitext(path.lower())
+    if extension in COMPRESSED_EXTENSIONS:
+        root, extension = os.path.splitext(root)
+    return extension[1:] in PLAIN_FASTA_EXTENSIONS and os.path.isfile(path)
+
+
+def resolve_data_path(path, root=DATA_ROOT):
+    """Resolve a path relative to root, symlinks included, refusing anything that ends up outside it"""
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"{path} is outside the data directory {root}")
+    return resolved
+
+
+def fasta_paths(path):
+    """The FASTA file at path, or every FASTA file directly inside a directory, in name order"""
+    if not os.path.isdir(path):
+        if not is_fasta_file(path):
+            raise ValueError(
+                f"{path} is not a FASTA file ({', '.join('.' + ext for ext in PLAIN_FASTA_EXTENSIONS)}, "
+                f"optionally {' or '.join(COMPRESSED_EXTENSIONS)} compressed)"
+            )
+        return [path]
+    names = sorted(name for name in os.listdir(path) if is_fasta_file(os.path.join(path, name)))
+    if not names:
+        raise ValueError(f"No FASTA files found in {path}")
+    return [os.path.join(path, name) for name in names]
+
+
+class FastaShards:
+    """One streaming pass over the records of several FASTA files, plain or compressed"""
+
+    def __init__(self, paths, batch_size=DEFAULT_BATCH_SIZE):
+        self.paths = list(paths)
+        self.batch_size = batch_size
+        self.total_bytes = sum(os.path.getsize(path) for path in self.paths)
+        self._done_bytes = 0
+        self._raw = None
+
+    def fraction(self):
+        """Fraction of the input bytes read so far"""
+        current = self._raw.tell() if self._raw is not None and not self._raw.closed else 0
+        return (self._done_bytes + current) / max(self.total_bytes, 1)
+
+    def __iter__(self):
+        for path in self.paths:
+            with open(path, "rb") as raw, open_decompressed(raw) as handle:
+                self._raw = raw
+                yield from iter_fasta_batches(handle, batch_size=self.batch_size)
+            self._raw = None
+            self._done_bytes += os.path.getsize(path)
+
+
+def summarize_batch(batch):
+    """Summary of one streamed batch of records"""
+    return DatasetSummary().update_batch(batch)
+
+
+def summarize_fasta_shards(shards, workers=1, progress=None):
+    """
+    Summarize FASTA records in a single streaming pass. Only the summary and
+    the few batches in flight are held, so memory stays flat however many
+    sequences the files contain. Batches are summarized across workers and
+    merged in order.
+    """
+    summary = DatasetSummary()
+    for part in imap_ordered(summarize_batch, iter(shards), workers=workers, progress=progress):
+        summary.merge(part)
+    if not len(summary):
+        raise ValueError("No FASTA records found in file")
+    return summary
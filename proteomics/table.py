@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Compact dtypes of the parsed protein table. Organism, evidence level and
+# sequence version repeat across proteins, so they are categorical
+# dictionaries; identifiers, names and sequences are Arrow strings instead of
+# one Python object per value.
+TABLE_DTYPES = {
+    "ID": "string[pyarrow]",
+    "Length": "int32",
+    "Sequence": "string[pyarrow]",
+    "Protein Name": "string[pyarrow]",
+    "OS": "category",
+    "OX": "Int32",
+    "GN": "string[pyarrow]",
+    "PE": "category",
+    "SV": "category",
+}
+
+INT32_MAX = np.iinfo(np.int32).max
+
+
+def compact_table(frame):
+    """Convert the columns of a protein table to TABLE_DTYPES"""
+    dtypes = {column: dtype for column, dtype in TABLE_DTYPES.items() if column in frame.columns}
+    # Taxonomy identifiers are small, but the header format does not bound them
+    if "OX" in dtypes:
+        largest = frame["OX"].max()
+        if pd.notna(largest) and largest > INT32_MAX:
+            dtypes["OX"] = "Int64"
+    return frame.astype(dtypes)
+
+
+def concat_tables(frames):
+    """Concatenate compact tables in order, merging the categorical dictionaries so those columns stay categorical"""
+    frames = list(frames)
+    categorical = [column for column in frames[0].columns if isinstance(frames[0][column].dtype, pd.CategoricalDtype)]
+    table = pd.concat([frame.drop(columns=categorical) for frame in frames], ignore_index=True)
+    for column in categorical:
+        table[column] = union_categoricals([frame[column] for frame in frames], ignore_order=True)
+    return table[list(frames[0].columns)]
+
+
+def table_memory(frame):
+    """Return the bytes held by each column of a table, Python objects included"""
+    return frame.memory_usage(deep=True, index=False)
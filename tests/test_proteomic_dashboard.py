@@ -0,0 +1,79 @@
+"""Run the proteomic dashboard headless with Streamlit's AppTest"""
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# The disk result cache directory is read when the dashboard is first imported
+os.environ.setdefault("PROTEOMICS_CACHE_DIR", tempfile.mkdtemp(prefix="proteomics-cache-"))
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+
+
+def dashboard_page():
+    import proteomic_dashboard
+
+    proteomic_dashboard.main()
+
+
+def write_fasta(path, count, seed):
+    """Write count UniProt-style records; the seed keeps every test's content, and so its cache key, apart"""
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        for i in range(count):
+            sequence = "".join(rng.choice(AMINO_ACIDS) for _ in range(rng.randint(30, 300)))
+            f.write(
+                f">sp|T{seed}{i:05d}|TEST{i}_HUMAN Test protein {i} OS=Homo sapiens OX=9606 GN=TP{i} PE=1 SV=1\n"
+                f"{sequence}\n"
+            )
+
+
+def click_analyze(at):
+    at.button[0].click().run()
+    assert not at.exception
+    assert not at.error, [error.value for error in at.error]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("data")
+    return tmp_path / "data"
+
+
+def test_analyze_default_file_twice(data_dir):
+    write_fasta(data_dir / "train_sequences.fasta", 200, seed=1)
+    for _ in range(2):
+        # A new session each time, as a second visitor analyzing the same file
+        at = AppTest.from_function(dashboard_page, default_timeout=120).run()
+        click_analyze(at)
+        click_analyze(at)
+
+
+def test_summarize_out_of_core_twice(data_dir):
+    os.mkdir(data_dir / "shards")
+    for shard in range(2):
+        write_fasta(data_dir / "shards" / f"part{shard}.fasta", 100, seed=10 + shard)
+    for _ in range(2):
+        at = AppTest.from_function(dashboard_page, default_timeout=120).run()
+        at.radio[0].set_value("Summarize a large file or shard directory").run()
+        at.text_input[0].input("shards").run()
+        click_analyze(at)
+        click_analyze(at)
+
+
+def test_new_search_starts_at_first_page(data_dir):
+    write_fasta(data_dir / "train_sequences.fasta", 400, seed=2)
+    at = AppTest.from_function(dashboard_page, default_timeout=120).run()
+    click_analyze(at)
+    at.number_input(key="search_page").set_value(2).run()
+    at.text_input[0].input("Test protein 1").run()
+    assert at.number_input(key="search_page").value == 1
+    # One page entry in session state, whatever was searched
+    assert [key for key in at.session_state.filtered_state if key.startswith("search_page")] == ["search_page"]
@@ -0,0 +1,202 @@
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import psutil
+import streamlit as st
+from prometheus_client import Counter, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+# Port of the Prometheus endpoint; the exporter stays off while it is unset
+METRICS_PORT = os.environ.get("BIOCORE_METRICS_PORT")
+# Show the debug panel on every page; otherwise it is opened per session with ?debug=1
+DEBUG_PANEL = os.environ.get("BIOCORE_DEBUG_PANEL") == "1"
+
+# Stage spans kept per session for the debug panel
+MAX_SESSION_SPANS = 100
+
+SPANS_KEY = "_instrumentation_spans"
+CACHE_KEY = "_instrumentation_cache"
+PAYLOAD_KEY = "_instrumentation_payload"
+
+STAGE_SECONDS = Histogram(
+    "biocore_stage_seconds",
+    "Wall time of one dashboard stage",
+    ["page", "stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+# Resident memory is process-wide, so concurrent sessions blur each other's spans
+STAGE_RSS_GROWTH = Histogram(
+    "biocore_stage_rss_growth_bytes",
+    "Growth of the server's resident memory over one dashboard stage",
+    ["page", "stage"],
+    buckets=tuple(1 << shift for shift in range(16, 35, 2)),
+)
+CACHE_REQUESTS = Counter(
+    "biocore_cache_requests",
+    "Calls of st.cache_data functions, by whether the cached value was reused",
+    ["function", "result"],
+)
+PAYLOAD_BYTES = Counter(
+    "biocore_payload_bytes",
+    "Bytes of figure and HTML payload sent to browsers",
+    ["page", "kind"],
+)
+
+_server_lock = threading.Lock()
+_server_started = False
+_calls = threading.local()
+
+
+def start_metrics_server():
+    """Serve this process's metrics on BIOCORE_METRICS_PORT, once; does nothing while it is unset"""
+    global _server_started
+    if not METRICS_PORT:
+        return False
+    with _server_lock:
+        if not _server_started:
+            try:
+                start_http_server(int(METRICS_PORT))
+            except OSError as e:
+                # Another server process on this host already exports on the port
+                logger.warning("Prometheus endpoint not started on port %s: %s", METRICS_PORT, e)
+            _server_started = True
+    return True
+
+
+def _session_value(key, default):
+    """A per-session accumulator, or None outside a running app"""
+    if not st.runtime.exists():
+        return None
+    if key not in st.session_state:
+        st.session_state[key] = default()
+    return st.session_state[key]
+
+
+@contextmanager
+def stage(page, name):
+    """Record the wall time and resident memory growth of one stage of a page"""
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        rss_after = process.memory_info().rss
+        STAGE_SECONDS.labels(page, name).observe(seconds)
+        STAGE_RSS_GROWTH.labels(page, name).observe(max(rss_after - rss_before, 0))
+        spans = _session_value(SPANS_KEY, list)
+        if spans is not None:
+            spans.append({
+                "Page": page,
+                "Stage": name,
+                "Seconds": round(seconds, 4),
+                "RSS Growth (MiB)": round((rss_after - rss_before) / (1 << 20), 1),
+                "RSS (MiB)": round(rss_after / (1 << 20), 1),
+            })
+            del spans[:-MAX_SESSION_SPANS]
+
+
+def record_payload(page, kind, payload):
+    """Count the bytes of a figure spec or HTML document sent to the browser, while anything reads them"""
+    if not instrumentation_enabled():
+        return
+    size = len(payload.encode("utf-8")) if isinstance(payload, str) else len(payload)
+    PAYLOAD_BYTES.labels(page, kind).inc(size)
+    totals = _session_value(PAYLOAD_KEY, dict)
+    if totals is not None:
+        totals[(page, kind)] = totals.get((page, kind), 0) + size
+
+
+def cache_data(**kwargs):
+    """
+    st.cache_data that also counts, per function, whether each call reused a
+    cached value or ran the function. A call is a miss when the function body
+    runs; the flag is kept per thread so nested cached calls count separately.
+    """
+    def decorate(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def compute(*args, **func_kwargs):
+            _calls.stack[-1] = True
+            return func(*args, **func_kwargs)
+
+        cached = st.cache_data(**kwargs)(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **func_kwargs):
+            if not hasattr(_calls, "stack"):
+                _calls.stack = []
+            _calls.stack.append(False)
+            try:
+                value = cached(*args, **func_kwargs)
+            finally:
+                missed = _calls.stack.pop()
+            result = "miss" if missed else "hit"
+            CACHE_REQUESTS.labels(name, result).inc()
+            counts = _session_value(CACHE_KEY, dict)
+            if counts is not None:
+                counts[(name, result)] = counts.get((name, result), 0) + 1
+            return value
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorate
+
+
+def debug_panel_enabled():
+    return DEBUG_PANEL or (st.runtime.exists() and st.query_params.get("debug") == "1")
+
+
+def instrumentation_enabled():
+    """Whether the Prometheus endpoint or this session's debug panel reads the metrics"""
+    return bool(METRICS_PORT) or debug_panel_enabled()
+
+
+def render_debug_panel():
+    """Sidebar panel with this session's stage spans, cache hit rates and payload bytes"""
+    if not debug_panel_enabled():
+        return
+    with st.sidebar.expander("Performance Debug", expanded=False):
+        rss = psutil.Process().memory_info().rss
+        st.caption(f"Server resident memory: {rss / (1 << 20):,.0f} MiB")
+
+        spans = _session_value(SPANS_KEY, list) or []
+        st.markdown("**Recent stages**")
+        if spans:
+            st.dataframe(pd.DataFrame(spans[::-1]), hide_index=True, use_container_width=True)
+        else:
+            st.caption("No stage has run in this session yet.")
+
+        counts = _session_value(CACHE_KEY, dict) or {}
+        if counts:
+            st.markdown("**Cache hits**")
+            names = sorted({name for name, _ in counts})
+            table = pd.DataFrame({
+                "Function": [name.rsplit(".", 1)[-1] for name in names],
+                "Hits": [counts.get((name, "hit"), 0) for name in names],
+                "Misses": [counts.get((name, "miss"), 0) for name in names],
+            })
+            table["Hit Rate"] = (table["Hits"] / (table["Hits"] + table["Misses"])).round(2)
+            st.dataframe(table, hide_index=True, use_container_width=True)
+
+        totals = _session_value(PAYLOAD_KEY, dict) or {}
+        if totals:
+            st.markdown("**Payload sent**")
+            st.dataframe(pd.DataFrame({
+                "Page": [page for page, _ in totals],
+                "Kind": [kind for _, kind in totals],
+                "KiB": [round(size / 1024, 1) for size in totals.values()],
+            }), hide_index=True, use_container_width=True)
+
+        if METRICS_PORT:
+            st.caption(f"Process-wide metrics are exported for Prometheus on port {METRICS_PORT} (/metrics).")
+        else:
+            st.caption("Set BIOCORE_METRICS_PORT to export these metrics for Prometheus.")